@@ -0,0 +1,43 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+from shmKew import ResultStore
+
+# Version of the results of the learners, part of every cache key. Bump it on
+#   any change to the learners or control functions that changes their results
+#   so that results cached by earlier code are no longer loaded
+version = 2
+
+# Hash of a configuration, any value that can be written as JSON with keys in
+#   sorted order so that equal configurations give equal keys
+def key(config):
+    text = json.dumps(config, sort_keys=True, default=repr)
+
+    return hashlib.sha256(text.encode()).hexdigest()
+
+# On-disk cache of the aggregate arrays of experiments, stored in a directory
+#   as one .npz file per experiment named by the key of everything that
+#   determines its results, including the version of the learners
+class ResultCache:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def file(self, k):
+        return os.path.join(self.path, k + '.npz')
+
+    # Aggregate arrays stored under a key, or None if not cached
+    def get(self, k):
+        try: f = np.load(self.file(k))
+        except FileNotFoundError: return None
+
+        with f: return tuple(f[n] for n in ResultStore.names)
+
+    # Store aggregate arrays under a key, written to a temporary file first so
+    #   that an interrupted write never leaves a partial entry
+    def put(self, k, result):
+        temp = self.file(k + '.tmp')
+        np.savez(temp, **dict(zip(ResultStore.names, result)))
+        os.replace(temp, self.file(k))
@@ -0,0 +1,60 @@
+import os
+import json
+import numpy as np
+
+from shmKew import ResultStore
+
+# Checkpoint of a sweep in a directory holding one .npz file per completed
+#   chunk of runs, written by the worker as soon as the chunk finishes so a
+#   restarted sweep of the same experiments skips it. With tables set the
+#   Q-tables and random generator state of the learner after the last run of
+#   the chunk are saved alongside its aggregate arrays for inspection. They
+#   are not read back on resuming, as every chunk reseeds its learner and
+#   refills its tables
+class Checkpoint:
+    def __init__(self, path, experiments, runs, dataPoints, chunk,
+            tables=False, key=None):
+        self.path = path
+        self.tables = tables
+        os.makedirs(path, exist_ok=True)
+
+        # Refuse to resume a checkpoint of a sweep of another shape, or of
+        #   other experiments or seed as given by the key of the sweep
+        shape = {'experiments': experiments, 'runs': runs,
+                'dataPoints': int(dataPoints), 'chunk': chunk, 'key': key}
+        manifest = os.path.join(path, 'manifest.json')
+        if os.path.exists(manifest):
+            with open(manifest) as f: saved = json.load(f)
+            if saved != shape:
+                raise ValueError(f'Checkpoint {path} is of sweep {saved}')
+        else:
+            with open(manifest, 'w') as f: json.dump(shape, f)
+
+    def file(self, e, start):
+        return os.path.join(self.path, f'{e}_{start}.npz')
+
+    # Check if a chunk has been completed
+    def done(self, e, start):
+        return os.path.exists(self.file(e, start))
+
+    # Aggregate arrays of a completed chunk
+    def load(self, e, start):
+        with np.load(self.file(e, start)) as f:
+            return tuple(f[n] for n in ResultStore.names)
+
+    # Save the aggregate arrays of a completed chunk and, if set, the state of
+    #   its learner, written to a temporary file first so that an interrupted
+    #   write never leaves a partial chunk. Only tables that are arrays are
+    #   saved, as unused tables of a learner are None
+    def save(self, e, start, aggr, q=None):
+        arrays = dict(zip(ResultStore.names, aggr))
+
+        if self.tables and q is not None:
+            for n in ('Q', 'Q1', 'Q2'):
+                if isinstance(getattr(q, n, None), np.ndarray):
+                    arrays[n] = getattr(q, n)
+            arrays['rng'] = json.dumps(q.rng.gen.bit_generator.state)
+
+        temp = self.file(e, str(start) + '.tmp')
+        np.savez(temp, **arrays)
+        os.replace(temp, self.file(e, start))
@@ -0,0 +1,118 @@
+import os
+import json
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from shmKew import ResultStore
+
+# Columnar result store on disk holding one memory-mapped .npy file per array
+#   and a JSON manifest of its shape and the configuration of each experiment.
+#   It has the interface of ResultStore so worker processes write the rows of
+#   their runs straight into the files as each chunk completes, along with the
+#   wall time of each run (NaN for runs loaded from a cache or checkpoint) and
+#   a mask of the runs written. Analysis can open the store read-only and map
+#   the learning curves rather than loading them
+class ColumnStore:
+    # Names of the aggregate arrays in the order returned by do.do, then the
+    #   seconds taken by each run and the mask of completed runs
+    names = ResultStore.names + ('seconds', 'done')
+
+    def __init__(self, path, experiments, runs, dataPoints, configs=None,
+            mode='r+'):
+        self.path = path
+        self.experiments = experiments
+        self.runs = runs
+        self.dataPoints = int(dataPoints)
+        self.mode = mode
+
+        # Create the files unless a store of the same shape and configurations
+        #   is already there, which is reopened so a resumed sweep keeps its
+        #   completed runs
+        shape = {'experiments': experiments, 'runs': runs,
+                'dataPoints': self.dataPoints}
+        manifest = self.file('manifest.json')
+        create = True
+        if os.path.exists(manifest):
+            with open(manifest) as f: saved = json.load(f)
+            create = saved['shape'] != shape or (configs is not None and
+                    json.loads(json.dumps(configs, default=repr)) !=
+                    saved['configs'])
+        if create and mode == 'r':
+            raise ValueError(f'No store of shape {shape} in {path}')
+
+        if create:
+            os.makedirs(path, exist_ok=True)
+            with open(manifest, 'w') as f:
+                json.dump({'shape': shape, 'names': self.names,
+                    'configs': configs}, f, default=repr)
+        self.configs = configs if create else saved['configs']
+
+        self.views(create)
+
+    # Open an existing store, read-only by default
+    @classmethod
+    def open(cls, path, mode='r'):
+        with open(os.path.join(path, 'manifest.json')) as f:
+            shape = json.load(f)['shape']
+
+        return cls(path, shape['experiments'], shape['runs'],
+                shape['dataPoints'], mode=mode)
+
+    def file(self, name):
+        return os.path.join(self.path, name)
+
+    # Map the arrays of the store, creating the files if set
+    def views(self, create=False):
+        rows = (self.experiments, self.runs)
+        shapes = [rows] * 2 + [rows + (self.dataPoints, )] * 5 + [rows] * 2
+        dtypes = [np.float64] * 8 + [np.bool_]
+
+        self.arrays = []
+        for n, shape, dtype in zip(self.names, shapes, dtypes):
+            if create:
+                a = open_memmap(self.file(n + '.npy'), 'w+', dtype, shape)
+                if n == 'seconds': a[:] = np.nan
+            else: a = np.load(self.file(n + '.npy'), mmap_mode=self.mode)
+            self.arrays.append(a)
+
+        for n, a in zip(self.names, self.arrays): setattr(self, n, a)
+
+    # Pickle the store as its path and shape, reopened by each worker
+    def __getstate__(self):
+        return (self.path, self.experiments, self.runs, self.dataPoints)
+
+    def __setstate__(self, state):
+        self.path, self.experiments, self.runs, self.dataPoints = state
+        self.mode = 'r+'
+        self.views()
+
+    # Write aggregate arrays for the runs start onwards of an experiment and
+    #   the seconds taken by the whole chunk if known, flushed to disk before
+    #   the runs are marked as done
+    def write(self, e, start, aggr, seconds=None):
+        stop = start + len(aggr[0])
+        for res, a in zip(self.arrays, aggr): res[e, start:stop] = a
+        if seconds is not None:
+            self.seconds[e, start:stop] = seconds / (stop - start)
+        for a in self.arrays[:-1]: a.flush()
+
+        self.done[e, start:stop] = True
+        self.done.flush()
+
+    # Aggregate arrays of an experiment in the order returned by do.do
+    def result(self, e):
+        return tuple(a[e] for a in self.arrays[:len(ResultStore.names)])
+
+    # Release the maps of the files, which stay on disk
+    def close(self):
+        if self.mode != 'r':
+            for a in self.arrays: a.flush()
+        self.arrays = []
+        for n in self.names:
+            if hasattr(self, n): delattr(self, n)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,14 +1,23 @@
-import gym
 import math
 import numpy as np
 
+import kewEnv
+from disKew import Discretiser
+from greedyKew import GreedyCache, row_max
+from rngKew import KewRng
+from statKew import RewardWindow
+from trailKew import PenaltyTrail
+
 # Q-learning class to train and test q table for given environment 
 class DblKew:   
     def __init__(self, init, pol, env, cOS, cAS, dis, maxS, nTst, gDec, ver,
-            rTst, rTrn):
+            rTst, rTrn, npEnv=False, seed=None, log=False):
 
-        # Set poliy bools for control of Q-learning
-        if pol == 'q_lrn':
+        # Set poliy bools for control of Q-learning. Expected SARSA chooses
+        #   actions as Q-Lrn and takes the expected value of the next state
+        #   under the e-greedy policy in place of its maximum
+        self.polE = pol == 'expected_sarsa'
+        if pol == 'q_lrn' or self.polE:
             self.polQ = True
             self.polS = False
         elif pol == 'sarsa':
@@ -28,19 +37,124 @@ class DblKew:
         self.verboseFlag = ver
         self.renderTest = rTst
         self.renderTrain = rTrn
+        self.npEnv = npEnv
+        self.logFlag = log
+
+        # Use the step kernel of lrn where it applies
+        self.kernel = True
+
+        # Ring buffer of the most recent state-action pairs of an episode, and
+        #   the table each updated, for the exponential penalty applied when
+        #   the log flag is set
+        self.trail = PenaltyTrail()
+
+        # Environments of the learner by number of lanes and step limit,
+        #   created when first needed and reused by every following run and bin
+        self.envs = {}
+
+        # Q-tables and counters, refilled in place by each run once created
+        self.Q = None
+        self.Q1 = None
+        self.Q2 = None
+        self.N = None
+
+        # Set seed from which the random streams of each run are spawned
+        self.set_seed(seed)
+
+    # Set the seed (an int or a SeedSequence) of the learner, each call to
+    #   init_env or init_batch spawns independent and reproducible random
+    #   streams from it
+    def set_seed(self, seed):
+        if isinstance(seed, np.random.SeedSequence): self.seed_seq = seed
+        else: self.seed_seq = np.random.SeedSequence(seed)
+
+    # Get the environment with n lanes (a single environment if n is None),
+    #   created on first use and reseeded with the given seed on every call.
+    #   If maxSteps is given the lanes reset on their own when they complete
+    #   the task or after maxSteps steps
+    def get_env(self, seed, n=None, maxSteps=None):
+        key = (n, maxSteps)
+        if key not in self.envs:
+            # Use the built-in NumPy simulator if set, importing gym only when
+            #   one of its environments is needed
+            if n is not None or self.npEnv:
+                self.envs[key] = kewEnv.make(self.environment, n,
+                        autoReset=maxSteps is not None, maxSteps=maxSteps)
+            else:
+                import gym
+                self.envs[key] = gym.make(self.environment).env
+        env = self.envs[key]
+
+        # Seed gym environments with an int drawn from the seed
+        if n is None and not self.npEnv:
+            env.seed(int(seed.generate_state(1)[0]))
+        else: env.seed(seed)
+
+        return env
 
     # Initialize environment and Q-table
     def init_env(self, resolution):
 
-        # Create numpy array to store rewards for use in statistical tracking
-        self.timestep_reward_res = np.zeros(resolution)
+        # Create rolling window of episode rewards for statistical tracking
+        self.window = RewardWindow(resolution)
         self.resolution = resolution
-        self.res = 0
 
-        # Initialize environment
-        self.env = gym.make(self.environment).env
+        # Spawn the seeds of the environments and learner for this run
+        env_seed, rng_seed, self.test_seed = self.seed_seq.spawn(3)
+
+        # Reseed the environment, created on the first run only
+        self.env = self.get_env(env_seed)
         self.env.reset()
         
+        # Calculate the discrete observation and action spaces and create the
+        #   random streams of the run
+        self.init_spaces()
+        self.rng = KewRng(rng_seed, self.action_n)
+        
+        # Initialise q-tables with supplied type, stored as contiguous
+        #   (n_states, action_n) tables indexed by flat state index with Q1
+        #   and Q2 as views of them in the shape of the observation and action
+        #   spaces
+        size = self.discrete_os_size + self.discrete_as_size
+        self.Q1 = self.init_table(size, self.Q1)
+        self.Q2 = self.init_table(size, self.Q2)
+        self.Q1f = self.Q1.reshape(self.n_states, -1)
+        self.Q2f = self.Q2.reshape(self.n_states, -1)
+
+        # Cache the greedy actions of each table and of their sum, updated with
+        #   each change to the tables during training
+        self.greedy1 = GreedyCache(self.Q1f)
+        self.greedy2 = GreedyCache(self.Q2f)
+        self.greedy = GreedyCache(self.Q1f, self.Q2f)
+
+        # Create counter array for calculating decayed gamma values
+        if self.gDecayFlag:
+            if self.N is None or self.N.shape != self.Q1f.shape:
+                self.N = np.empty(self.Q1f.shape)
+            self.N.fill(1)
+        
+        return
+
+    # Create a q-table of the given size with the supplied initialisation type,
+    #   filling the table Q in place instead if it is already of that size
+    def init_table(self, size, Q=None):
+        if Q is None or Q.shape != tuple(size): Q = np.empty(size)
+
+        # Uniform values in [-2, 0) drawn as with Generator.uniform
+        if self.initialisation == 'uniform':
+            self.rng.gen.random(out=Q.reshape(-1))
+            Q *= 2
+            Q += -2
+        elif self.initialisation == 'zeros': Q.fill(0)
+        elif self.initialisation == 'ones': Q.fill(1)
+        else: print('initialisation method not valid')
+
+        return Q
+
+    # Calculate the sizes of the discrete observation and action spaces of the
+    #   environment
+    def init_spaces(self):
+
         # If observation space is continuous do calculations to create
         #   corresponding bins for use with Q table
         if self.cont_os:
@@ -56,8 +170,15 @@ class DblKew:
             self.discrete_os_size = [self.dis] * len(self.os_high)
             self.discrete_os_win_size = (self.os_high\
                     - self.os_low) / self.discrete_os_size
+
+            # Create the discretiser used to map observations to bins
+            self.disc = Discretiser(self.os_low, self.os_high,
+                    self.discrete_os_size)
         # Use number of observations if no discretization is required
         else: self.discrete_os_size = [self.env.observation_space.n]
+
+        # Number of discrete states, the rows of the flat q-table
+        self.n_states = int(np.prod(self.discrete_os_size))
         
         # The same for action space
         if self.cont_as:
@@ -73,38 +194,14 @@ class DblKew:
         else:
             self.discrete_as_size = [self.env.action_space.n]
             self.action_n = self.env.action_space.n
-        
-        # Initialise q-table with supplied type
-        if self.initialisation == 'uniform':
-            self.Q1 = np.random.uniform(low = -2, high = 0, size=(
-                self.discrete_os_size + self.discrete_as_size))
-            self.Q2 = np.random.uniform(low = -2, high = 0, size=(
-                self.discrete_os_size + self.discrete_as_size))
-        elif self.initialisation == 'zeros':
-            self.Q1 = np.zeros((self.discrete_os_size,
-                self.discrete_as_size))
-            self.Q2 = np.zeros((self.discrete_os_size,
-                self.discrete_as_size))
-        elif self.initialisation == 'ones':
-            self.Q1 = np.ones((self.discrete_os_size,
-                self.discrete_as_size))
-            self.Q2 = np.ones((self.discrete_os_size,
-                self.discrete_as_size))
-        else: print('initialisation method not valid')
 
-        # Create counter array for calculating decayed gamma values
-        if self.gDecayFlag:
-            self.N = np.ones((self.discrete_os_size + self.discrete_as_size))
-        
         return
 
-    # Get the discrete state from the state supplied by the environment
+    # Get the discrete state from the state supplied by the environment as the
+    #   flat index of its row in the q-table, clipped to the observation space
     def get_discrete_state(self, state):
         
-        discrete_state = ((state - self.os_low) /\
-                self.discrete_os_win_size)
-
-        return tuple(discrete_state.astype(np.int))
+        return self.disc.index(state)
 
     # Get the continuous action from the discrete action supplied by e-greedy
     def get_continuous_action(self, discrete_action):
@@ -119,9 +216,8 @@ class DblKew:
     #   epsilon value. Gets the continuous action if needed
     def e_greedy(self, epsilon, s, greedy=False):
         
-        if greedy or np.random.rand() > epsilon:
-            d_a = np.argmax(self.Q1[s]+self.Q2[s])
-        else: d_a = np.random.randint(0, self.action_n)
+        if greedy or self.rng.uniform() > epsilon: d_a = self.greedy.G[s]
+        else: d_a = self.rng.action()
 
         if self.cont_as: a = self.get_continuous_action(d_a)
         else: a = d_a
@@ -132,6 +228,11 @@ class DblKew:
     #   episode taking variables to control the training process
     def lrn(self, epsilon, episode, penalty, exponent, length, alpha, gamma):
 
+        # Use the step kernel unless training is rendered or actions continuous
+        if self.kernel and not self.renderTrain and not self.cont_as:
+            return self.lrn_kernel(epsilon, episode, penalty, exponent, length,
+                    alpha, gamma)
+
         # Set vars used for checks in training
         steps = 0
         maxS = False
@@ -146,6 +247,7 @@ class DblKew:
         else:
             s = self.env.reset()
             d_s = s
+        if self.logFlag: self.trail.clear(length)
 
         # Report episode and epsilon and set the episode to be rendered
         #   if the resolution is reached
@@ -162,7 +264,7 @@ class DblKew:
             if render: self.env.render()
             
             # Get random value to choose which Q-table to update
-            p = np.random.random()
+            p = self.rng.uniform()
             
             # Get initial action using e-Greedy method for Q-Lrn policy
             if self.polQ: a, d_a = self.e_greedy(epsilon, d_s)
@@ -189,26 +291,34 @@ class DblKew:
                     # For QL (off-policy) select maximum next action and get
                     #   corresponding Q-value of other Q-table
                     if self.polQ:
-                        oneA = np.argmax(self.Q1[d_s_])
-                        two = self.Q2[d_s_ + (oneA, )]
+                        oneA = self.greedy1.G[d_s_]
+                        two = self.Q2f[d_s_, oneA]
+                        if self.polE: two = self.expected(epsilon, self.Q2f,
+                                d_s_, two)
 
                     # For SARSA (on-policy) get Q-value of other Q-table based
                     #   on selected next action
-                    if self.polS: two = self.Q2[d_s_ + (d_a_, )]
+                    if self.polS: two = self.Q2f[d_s_, d_a_]
 
                     # Update Q-value with Bellman Equation using Q-value from
                     #   other Q-table
-                    self.Q1[d_s + (d_a, )] = self.Q1[d_s + (d_a, )] + alpha *\
-                            (reward + gamma * two - self.Q1[d_s + (d_a, )])
+                    self.Q1f[d_s, d_a] = self.Q1f[d_s, d_a] + alpha *\
+                            (reward + gamma * two - self.Q1f[d_s, d_a])
+                    self.greedy1.update(d_s, d_a)
+                    self.greedy.update(d_s, d_a)
                 else:
                     if self.polQ:
-                        twoA = np.argmax(self.Q2[d_s_])
-                        one = self.Q1[d_s_ + (twoA, )]
+                        twoA = self.greedy2.G[d_s_]
+                        one = self.Q1f[d_s_, twoA]
+                        if self.polE: one = self.expected(epsilon, self.Q1f,
+                                d_s_, one)
                     
-                    if self.polS: one = self.Q2[d_s_ + (d_a_, )]
+                    if self.polS: one = self.Q1f[d_s_, d_a_]
 
-                    self.Q2[d_s + (d_a, )] = self.Q2[d_s + (d_a, )] + alpha *\
-                            (reward + gamma * one - self.Q2[d_s + (d_a, )])
+                    self.Q2f[d_s, d_a] = self.Q2f[d_s, d_a] + alpha *\
+                            (reward + gamma * one - self.Q2f[d_s, d_a])
+                    self.greedy2.update(d_s, d_a)
+                    self.greedy.update(d_s, d_a)
 
             # If task is completed set Q-value to zero so no penalty is applied
             if done:
@@ -219,30 +329,38 @@ class DblKew:
                     # Update Q-value with Bellman Equation with next SA value
                     #   as 0 when the next state is terminal in 50:50 pattern
                     if p < 0.5:
-                        self.Q1[d_s + (d_a, )] = self.Q1[d_s + (d_a,)]\
+                        self.Q1f[d_s, d_a] = self.Q1f[d_s, d_a]\
                                 + alpha * (reward + gamma *\
-                                penalty - self.Q1[d_s + (d_a,)])
+                                penalty - self.Q1f[d_s, d_a])
+                        self.greedy1.update(d_s, d_a)
+                        self.greedy.update(d_s, d_a)
                     else:
-                        self.Q2[d_s + (d_a, )] = self.Q2[d_s + (d_a,)]\
+                        self.Q2f[d_s, d_a] = self.Q2f[d_s, d_a]\
                                 + alpha * (reward + gamma *\
-                                penalty - self.Q2[d_s + (d_a,)])
+                                penalty - self.Q2f[d_s, d_a])
+                        self.greedy2.update(d_s, d_a)
+                        self.greedy.update(d_s, d_a)
 
-                # Iterate the resolution counter and record rewards
-                if self.res == self.resolution: self.res = 0
-                else:
-                    self.timestep_reward_res[self.res] = total_reward
-                    self.res += 1
+                    # Apply exponential penalties to the steps leading up to
+                    #   the completion if the log flag is set
+                    if self.logFlag: self.penalise_trail(penalty, exponent)
+
+                # Record total reward in the rolling window
+                self.window.record(total_reward)
 
                 # Print resolution results if verbose flag is set
                 if self.verboseFlag and episode % self.resolution == 0\
                         and episode != 0:
-                    print(np.average(self.timestep_reward_res),
-                            np.min(self.timestep_reward_res),
-                            np.max(self.timestep_reward_res))
+                    print(*self.window.stats()[:3])
                 
                 # Close the render of the episode if rendered
                 if render: self.env.close()
 
+            # Record the state-action pair and the table updated for applying
+            #   exponential penalties
+            if self.logFlag:
+                self.trail.record(d_s * self.action_n + d_a, p >= 0.5)
+
             # Set next state to current state (Q-Learning) control policy
             if self.polQ: d_s = d_s_
 
@@ -254,8 +372,170 @@ class DblKew:
         
         return
 
+    # Equivalent of lrn for discrete actions without rendering, with the body
+    #   of each step working on Python numbers rather than numpy scalars as in
+    #   SinKew.lrn_kernel. Both tables are read and written through flat
+    #   memoryviews and the caches of each table and of their sum are updated
+    #   inline. Updates and random streams are bit-identical to lrn
+    def lrn_kernel(self, epsilon, episode, penalty, exponent, length, alpha,
+            gamma):
+
+        # Bind the tables, caches and random streams to locals
+        Q1 = memoryview(self.Q1f).cast('B').cast('d')
+        Q2 = memoryview(self.Q2f).cast('B').cast('d')
+        G1, M1 = self.greedy1.G, self.greedy1.M
+        G2, M2 = self.greedy2.G, self.greedy2.M
+        G, M = self.greedy.G, self.greedy.M
+        n = self.action_n
+        uniform, action = self.rng.uniform, self.rng.action
+        env = self.env
+        polQ, polS, polE = self.polQ, self.polS, self.polE
+        e_n, e_g = epsilon / n, 1 - epsilon
+        maxSteps = self.maxSteps
+        log, record = self.logFlag, self.trail.record
+
+        # Get the flat state index of an observation, reading the floats of the
+        #   state kept by a NumPy environment rather than its array copy
+        index = self.disc.index_floats if self.cont_os else int
+        if not self.cont_os: floats = lambda s: s
+        elif self.npEnv: floats = lambda s: env.s
+        else: floats = lambda s: s.tolist()
+
+        # Update the cache of a table, and then of the sum of the tables, after
+        #   the value at flat index i of action a in state s has changed, as
+        #   GreedyCache.update
+        def update(T, G_, M_, s, a, i):
+            for T, T2, G_, M_ in ((T, None, G_, M_), (Q1, Q2, G, M)):
+                q = T[i] if T2 is None else T[i] + T2[i]
+                m = M_[s]
+                g = G_[s]
+                if q > m or (q == m and a < g):
+                    G_[s] = a
+                    M_[s] = q
+                elif a == g and q < m:
+                    G_[s], M_[s] = row_max(T, s * n, n, T2)
+
+        # Set vars used for checks in training
+        steps = 0
+        maxS = False
+        done = False
+        total_reward = 0
+
+        d_s = index(floats(env.reset()))
+        if log: self.trail.clear(length)
+
+        # Report episode and epsilon if the resolution is reached
+        if episode % self.resolution == 0 and episode != 0:
+            if self.verboseFlag: print(episode, epsilon)
+
+        # Get initial action using e-Greedy method for SARSA policy
+        if polS:
+            if uniform() > epsilon: d_a = G[d_s]
+            else: d_a = action()
+
+        # Loop the task until task is completed or max steps are reached
+        while not done:
+            steps += 1
+
+            # Get random value to choose which Q-table to update
+            p = uniform()
+
+            # Get action using e-Greedy method for Q-Lrn policy
+            if polQ:
+                if uniform() > epsilon: d_a = G[d_s]
+                else: d_a = action()
+
+            # Step the environment and discretise the next state
+            s_, reward, done, info = env.step(d_a)
+            total_reward += reward
+            d_s_ = index(floats(s_))
+
+            # Flat index of the state-action pair to update
+            i = d_s * n + d_a
+
+            if maxS: done = True
+
+            # Update Q-value of one table in 50:50 pattern by selected policy
+            #   with the value of the other table, or with the penalty if the
+            #   task is completed and max steps were not reached
+            if not done:
+                if polS:
+                    if uniform() > epsilon: d_a_ = G[d_s_]
+                    else: d_a_ = action()
+
+                if p < 0.5:
+                    if polS: other = Q2[d_s_ * n + d_a_]
+                    if polQ: other = Q2[d_s_ * n + G1[d_s_]]
+                    if polE: other = e_n * sum(Q2[d_s_ * n:d_s_ * n + n])\
+                            + e_g * other
+                    Q1[i] = Q1[i] + alpha * (reward + gamma * other - Q1[i])
+                    update(Q1, G1, M1, d_s, d_a, i)
+                else:
+                    if polS: other = Q1[d_s_ * n + d_a_]
+                    if polQ: other = Q1[d_s_ * n + G2[d_s_]]
+                    if polE: other = e_n * sum(Q1[d_s_ * n:d_s_ * n + n])\
+                            + e_g * other
+                    Q2[i] = Q2[i] + alpha * (reward + gamma * other - Q2[i])
+                    update(Q2, G2, M2, d_s, d_a, i)
+            elif not maxS:
+                if p < 0.5:
+                    Q1[i] = Q1[i] + alpha * (reward + gamma * penalty - Q1[i])
+                    update(Q1, G1, M1, d_s, d_a, i)
+                else:
+                    Q2[i] = Q2[i] + alpha * (reward + gamma * penalty - Q2[i])
+                    update(Q2, G2, M2, d_s, d_a, i)
+
+            # Apply exponential penalties to the steps leading up to a
+            #   completion, then record the state-action pair and the table
+            #   updated, if log is set
+            if log:
+                if done and not maxS: self.penalise_trail(penalty, exponent)
+                record(i, p >= 0.5)
+
+            # Move to the next state, and action for SARSA
+            d_s = d_s_
+            if polS and not done: d_a = d_a_
+
+            # If max steps are reached complete episode and set max step flag
+            if steps == maxSteps: maxS = True
+
+        # Record total reward in the rolling window
+        self.window.record(total_reward)
+
+        # Print resolution results if verbose flag is set
+        if self.verboseFlag and episode % self.resolution == 0\
+                and episode != 0:
+            print(*self.window.stats()[:3])
+
+        return
+
+    # Expected value of state s in table Q under the e-greedy policy of the
+    #   other table for Expected SARSA, the dot product of its row with the
+    #   probability of each action taken as epsilon / n of the sum of the row
+    #   plus 1 - epsilon of the value q of the greedy action of the other table
+    def expected(self, epsilon, Q, s, q):
+        return epsilon / self.action_n * Q[s].sum() + (1 - epsilon) * q
+
+    # Add the exponentially decayed penalty to the q-values of the steps before
+    #   the completion of the task, recorded in the trail, in one scatter-add
+    #   per table and update the greedy caches of each changed value
+    def penalise_trail(self, penalty, exponent):
+        index, flag, w = self.trail.recent(penalty, exponent)
+
+        for Q, greedy, sel in ((self.Q1f, self.greedy1, ~flag),
+                (self.Q2f, self.greedy2, flag)):
+            np.add.at(Q.reshape(-1), index[sel], w[sel])
+
+            for i in set(index[sel].tolist()):
+                greedy.update(*divmod(i, self.action_n))
+                self.greedy.update(*divmod(i, self.action_n))
+
     # Test the Q-table with e-greedy method and return results
     def test_qtable(self):
+
+        # Play every test at once if the environment has a NumPy simulator
+        if self.npEnv and not self.renderTest: return self.test_vec()
+
         
         # Create array to store total rewards and steps for each test
         rewards = np.zeros(self.nTests)
@@ -302,4 +582,267 @@ class DblKew:
 
         return avg_rwd, std_rwd
 
+    # Test the q-table by playing all of the tests at once in a batched NumPy
+    #   environment. The table is frozen during testing so the greedy action
+    #   of every state is calculated once and looked up for each step
+    def test_vec(self):
+
+        # Create array to store total rewards for each test
+        rewards = np.zeros(self.nTests)
+
+        # Get the greedy policy and one environment lane per test
+        policy = self.greedy.policy()
+        env = self.get_env(self.test_seed, self.nTests)
+        s = env.reset()
+
+        # Loop until every test is done or max steps are reached
+        for steps in range(self.maxSteps):
+            s, reward, done, info = env.step(policy[self.disc.index(s)])
+            rewards += reward
+
+            if done.all(): break
+
+        # Get averages and standard deviations of the rewards for tests
+        avg_rwd = np.average(rewards)
+        std_rwd = np.std(rewards)
+
+        return avg_rwd, std_rwd
 
+    # Initialize a batched NumPy environment and the paired stacks of q-tables
+    #   held in one array of shape (2, runs, *discrete_os_size, action_n), with
+    #   Q1 and Q2 as views of its two halves and Qf, Q1f and Q2f as flat views
+    #   with n_states rows, so that every run is trained together by lrn_batch
+    #   and tested by test_batch
+    def init_batch(self, resolution, runs):
+
+        # Create rolling window of the episode rewards of each run
+        self.window = RewardWindow(resolution, runs)
+        self.resolution = resolution
+
+        # Initialize one environment lane per run, each lane resetting on its
+        #   own on the step after max steps as the episodes of lrn end
+        self.runs = runs
+        self.lanes = np.arange(runs)
+        env_seed, rng_seed, self.test_seed = self.seed_seq.spawn(3)
+        self.env = self.get_env(env_seed, runs, self.maxSteps + 1)
+        self.env.reset()
+
+        # Calculate the discrete observation and action spaces and create the
+        #   random streams of the runs
+        self.init_spaces()
+        self.rng = KewRng(rng_seed, self.action_n)
+        if not self.cont_os or self.cont_as:
+            raise ValueError('Batched training needs a continuous observation'
+                    ' space and a discrete action space')
+
+        # Initialise the paired stacks of q-tables with supplied type
+        self.Q = self.init_table([2, runs] + self.discrete_os_size +
+                self.discrete_as_size, self.Q)
+        self.Q1, self.Q2 = self.Q[0], self.Q[1]
+        self.Qf = self.Q.reshape(2, runs, self.n_states, -1)
+        self.Q1f, self.Q2f = self.Qf[0], self.Qf[1]
+
+        return
+
+    # Get the discrete states of every lane as clipped flat state indices
+    def get_discrete_states(self, states):
+        
+        return self.disc.index(states)
+
+    # Index of the q-table rows for the given lanes and their discrete states
+    def rows(self, lanes, d_s):
+        return (lanes, d_s[lanes])
+
+    # e-Greedy action selection for the given lanes from the sum of their own
+    #   pair of q-tables
+    def e_greedy_batch(self, epsilon, lanes, d_s):
+
+        r = self.rows(lanes, d_s)
+        d_a = np.argmax(self.Q1f[r] + self.Q2f[r], axis=1)
+        explore = self.rng.uniforms(len(lanes)) <= epsilon
+        d_a[explore] = self.rng.actions(np.count_nonzero(explore))
+
+        return d_a
+
+    # Train every run for the given number of episodes at once, following the
+    #   same updates and terminal handling as lrn for each lane. The Q1 or Q2
+    #   update is chosen per lane by a 50:50 mask that indexes the table to
+    #   update in the paired stack. Lanes of the environment reset on their
+    #   own when they complete the task or are cut off after max steps, so each
+    #   lane counts its own episodes and takes the epsilon, alpha and gamma of
+    #   its episode from the lists of the schedule while the batch stays full
+    #   until lanes run out of episodes. Returns the average, minimum, maximum,
+    #   upper and lower quartile learning curves of every lane, recorded as
+    #   each lane reaches a resolution step
+    def lrn_batch(self, episodes, epsilons, alphas, gammas, penalty, exponent,
+            length):
+
+        # Create array of the learning curves of every lane
+        curve = np.zeros((5, self.runs, -(-episodes // self.resolution)))
+        if episodes == 0: return curve
+
+        # Episode, steps and total reward of the current episode of each lane,
+        #   lanes are live until they complete their episodes
+        episode = np.zeros(self.runs, dtype=np.int64)
+        steps = np.zeros(self.runs, dtype=np.int64)
+        total_reward = np.zeros(self.runs)
+        live = np.ones(self.runs, dtype=bool)
+        slowest = 0
+
+        # Schedule of the current episode of each lane
+        epsilons = np.asarray(epsilons, dtype=float)
+        alphas = np.asarray(alphas, dtype=float)
+        gammas = np.asarray(gammas, dtype=float)
+        epsilon = epsilons[episode]
+        alpha = alphas[episode]
+        gamma = gammas[episode]
+
+        # Reset environment and get initial discretized states
+        d_s = self.get_discrete_states(self.env.reset())
+        d_a = np.zeros(self.runs, dtype=np.int64)
+        d_a_ = np.zeros(self.runs, dtype=np.int64)
+        if self.logFlag: self.trail.clear(length, self.runs)
+
+        # Get initial actions using e-Greedy method for SARSA policy
+        if self.polS: d_a = self.e_greedy_batch(epsilon, self.lanes, d_s)
+
+        # Loop until every lane has completed its episodes
+        while live.any():
+            idx = np.flatnonzero(live)
+            steps[idx] += 1
+
+            # Get random values to choose which Q-table each lane updates,
+            #   as the index of the table in the paired stack
+            tab = (self.rng.uniforms(self.runs) >= 0.5).astype(np.int64)
+
+            # Get actions using e-Greedy method for Q-Lrn policy
+            if self.polQ: d_a[idx] = self.e_greedy_batch(epsilon[idx], idx,
+                    d_s)
+
+            # Get next states from the chosen actions and record rewards, the
+            #   next states of lanes ending an episode are the initial states
+            #   of their next
+            s_, reward, ended, info = self.env.step(d_a)
+            total_reward[idx] += reward[idx]
+            d_s_ = self.get_discrete_states(s_)
+
+            # Split the live lanes into those continuing and those ending the
+            #   episode, of which those completing the task before the step
+            #   after max steps are updated with the penalty as in lrn
+            fin = idx[ended[idx]]
+            cont = idx[~ended[idx]]
+            end = fin[steps[fin] <= self.maxSteps]
+
+            # For QL (off-policy) select maximum next action from the table
+            #   being updated and get corresponding Q-value of the other table,
+            #   or its expected value under the e-greedy policy of the table
+            #   being updated for Expected SARSA
+            if self.polQ:
+                r_ = self.rows(cont, d_s_)
+                oneA = np.argmax(self.Qf[(tab[cont], ) + r_], axis=1)
+                future = self.Qf[(1 - tab[cont], ) + r_ + (oneA, )]
+                if self.polE: future = epsilon[cont] / self.action_n *\
+                        self.Qf[(1 - tab[cont], ) + r_].sum(axis=1) +\
+                        (1 - epsilon[cont]) * future
+
+            # For SARSA (on-policy) select next action based on next state
+            #   using e-Greedy method and get its Q-value from the other table
+            if self.polS:
+                d_a_[cont] = self.e_greedy_batch(epsilon[cont], cont, d_s_)
+                future = self.Qf[(1 - tab[cont], ) + self.rows(cont, d_s_)\
+                        + (d_a_[cont], )]
+
+            # Update Q-values of the selected tables with Bellman Equation,
+            #   using the penalty as next SA value for completed tasks
+            upd = np.concatenate((cont, end))
+            value = np.concatenate((future, np.full(len(end), penalty)))
+            sa = (tab[upd], ) + self.rows(upd, d_s) + (d_a[upd], )
+            self.Qf[sa] = self.Qf[sa] + alpha[upd] * (reward[upd] +\
+                    gamma[upd] * value - self.Qf[sa])
+
+            # Apply exponential penalties to the steps leading up to the
+            #   completion of the ending lanes, then record the state-action
+            #   pairs and tables updated of the continuing lanes, if the log
+            #   flag is set
+            if self.logFlag:
+                if len(end): self.penalise_batch(end, penalty, exponent)
+                self.trail.record(d_s[cont] * self.action_n + d_a[cont],
+                        tab[cont], cont)
+
+            # Record the total rewards of the ending lanes in the rolling
+            #   window and their learning curves at each resolution step, then
+            #   start their next episodes
+            if len(fin):
+                self.window.record(total_reward[fin], fin)
+                rec = fin[episode[fin] % self.resolution == 0]
+                curve[:, rec, episode[rec] // self.resolution] =\
+                        self.window.stats(rec)
+
+                episode[fin] += 1
+                steps[fin] = 0
+                total_reward[fin] = 0
+                live[fin] = episode[fin] < episodes
+                if self.logFlag: self.trail.restart(fin)
+
+                # Get the schedule of the next episodes and their initial
+                #   actions for SARSA
+                new = fin[live[fin]]
+                epsilon[new] = epsilons[episode[new]]
+                alpha[new] = alphas[episode[new]]
+                gamma[new] = gammas[episode[new]]
+                if self.polS:
+                    d_a_[new] = self.e_greedy_batch(epsilon[new], new, d_s_)
+
+                # Report the episode and epsilon of the slowest lane, and
+                #   the results of every lane, as it reaches each resolution
+                #   step if verbose flag is set
+                if self.verboseFlag and episode.min() > slowest:
+                    slowest = episode.min()
+                    if slowest % self.resolution == 0 and slowest < episodes:
+                        avg, mins, maxs = self.window.stats()[:3]
+                        print(slowest, epsilons[slowest])
+                        print(np.average(avg), np.min(mins), np.max(maxs))
+
+            # Set next states (and actions for SARSA) to current
+            d_s = d_s_
+            if self.polS: d_a, d_a_ = d_a_, d_a
+
+        return curve
+
+    # Add the exponentially decayed penalty to the q-values of the steps before
+    #   the completion of the task by the given lanes, in the table each step
+    #   updated, in one scatter-add
+    def penalise_batch(self, lanes, penalty, exponent):
+        index, flag, w = self.trail.recent(penalty, exponent, lanes)
+        np.add.at(self.Qf.reshape(2, self.runs, -1),
+                (flag.astype(np.int64), lanes[:, None], index), w)
+
+    # Test the q-tables of every run by playing all of the tests of every run
+    #   at once, with one lane per test in a batched NumPy environment and the
+    #   greedy policy of each run calculated once. Returns the average and
+    #   standard deviation of the test rewards for each run
+    def test_batch(self):
+
+        # Create array to store total rewards for each run and test
+        rewards = np.zeros(self.runs * self.nTests)
+
+        # Get the greedy policy of each run and the run of each test lane
+        policy = np.argmax(self.Q1f + self.Q2f, axis=2)
+        run = np.repeat(self.lanes, self.nTests)
+        env = self.get_env(self.test_seed, self.runs * self.nTests)
+        s = env.reset()
+
+        # Loop until every test is done or max steps are reached
+        for steps in range(self.maxSteps):
+            s, reward, done, info = env.step(policy[run,
+                self.get_discrete_states(s)])
+            rewards += reward
+
+            if done.all(): break
+
+        # Get averages and standard deviations of the rewards for each run
+        rewards = rewards.reshape(self.runs, self.nTests)
+        avg_rwd = np.average(rewards, axis=1)
+        std_rwd = np.std(rewards, axis=1)
+
+        return avg_rwd, std_rwd
@@ -0,0 +1,50 @@
+import numpy as np
+
+# Maps continuous observations to the bins of a discretised observation space.
+#   The bin widths and the strides of the flat state index are calculated once
+#   and observations outside of the bounds are clipped into the first or last
+#   bin rather than producing negative or overflowing indices
+class Discretiser:
+    def __init__(self, low, high, size):
+        self.low = low
+        self.high = high
+        self.size = np.array(size, dtype=np.int64)
+        self.win_size = (high - low) / self.size
+        self.top = self.size - 1
+
+        # Strides to ravel the bins into a flat index, in the same (C) order as
+        #   the states of the q-table
+        self.strides = np.ones(len(self.size), dtype=np.int64)
+        self.strides[:-1] = np.cumprod(self.size[::-1])[-2::-1]
+        self.n = int(np.prod(self.size))
+
+        # Bounds, bin widths, last bins and strides of each dimension as Python
+        #   numbers for discretising a single observation of floats
+        self.floats = list(zip(np.asarray(low, dtype=np.float64).tolist(),
+            self.win_size.tolist(), self.top.tolist(), self.strides.tolist()))
+
+    # Integer bins of observations with any leading shape, e.g. (N, obs_dim)
+    def bins(self, states):
+        d = ((states - self.low) / self.win_size).astype(np.int64)
+
+        return np.minimum(np.maximum(d, 0, out=d), self.top, out=d)
+
+    # Flat state indices of observations, (N, obs_dim) gives N indices
+    def index(self, states):
+        return self.bins(states).dot(self.strides)
+
+    # Flat state index of a single observation given as a sequence of floats,
+    #   with the same float64 arithmetic and truncation as index
+    def index_floats(self, state):
+        i = 0
+        for x, (low, win, top, stride) in zip(state, self.floats):
+            d = int((x - low) / win)
+            if d < 0: d = 0
+            elif d > top: d = top
+            i += d * stride
+
+        return i
+
+    # Bins of flat state indices
+    def unravel(self, index):
+        return np.unravel_index(index, self.size)
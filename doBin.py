@@ -1,7 +1,8 @@
-import math
 import numpy as np
 from timeit import default_timer as timer
 
+import schedKew
+
 # Function to run the various elements of training and testing of a Q-table
 def do(q, runs, episodes, bins, resolution, dataPoints, profileFlag, eDecayFlag,
         gamma, alpha, epsilon, decay, epsilonDecay, eDecayStart, eDecayEnd,
@@ -17,8 +18,10 @@ def do(q, runs, episodes, bins, resolution, dataPoints, profileFlag, eDecayFlag,
     aggr_ts_r_uq = np.zeros((runs, int(dataPoints)))
     aggr_ts_r_lq = np.zeros((runs, int(dataPoints)))
 
-    # Calculate decay esponent -TODO:change division to variable
-    if eDecayFlag and eDecayExp: exp = 1 / (episodes / 5)
+    # Calculate the epsilon, alpha and gamma of each episode
+    epsilons, alphas, gammas = schedKew.schedule(episodes, eDecayFlag, gamma,
+            alpha, epsilon, epsilonDecay, eDecayStart, eDecayEnd, eDecayRate,
+            eDecayExp, aDecayFlag, gDecayFlag)
     
     # Iterate through each run
     for r in range(runs):
@@ -32,58 +35,24 @@ def do(q, runs, episodes, bins, resolution, dataPoints, profileFlag, eDecayFlag,
             # Reset datapoints iterator for each run
             dp = 0
 
-            # Create arrays to store timestep values for profiling training
-            timestep_reward = np.zeros(int(dataPoints))
-            timestep_reward_min = np.zeros(int(dataPoints))
-            timestep_reward_max = np.zeros(int(dataPoints))
-            timestep_reward_up_q = np.zeros(int(dataPoints))
-            timestep_reward_low_q = np.zeros(int(dataPoints))
+            # Create array to store the average, minimum, maximum and quartile
+            #   learning curves for profiling training
+            curve = np.zeros((5, int(dataPoints)))
 
             # Reset environment and Q-tables
             q.init_env(resolution)
-            
-            # Reset decaying epsilon to starting value
-            if eDecayFlag and not eDecayExp: epsilon = epsilonDecay
 
             # Iterate through each episode in a run
             for episode in range(episodes):
                 #episode += 1
-                
-                # Check for epsilon decay flag
-                if eDecayFlag:
-                    # Check for linear epsilon decay
-                    if not eDecayExp:
-                        # Decay epsilon values during epsilon decay range
-                        if eDecayEnd >= episode >= eDecayStart:
-                            epsilon -= eDecayRate
-                            # Prevent epsilon from going negative
-                            if epsilon < 0:
-                                epsilon = 0
-                    # Check for exponential epsilon decay and calculate from episode
-                    elif eDecayExp: epsilon = 0.5 * math.exp(-exp * episode)
 
-                # Check alpha decay flag and set alpha according episode
-                if aDecayFlag:
-                    alpha = math.exp(-exp * episode)
-                # Also for gamma -TODO:replace hardcoded intersect values
-                if gDecayFlag:
-                    gamma = 1 + -math.exp(-exp * episode)
-                
                 # Perform learning for each episode
-                q.lrn(epsilon, episode, penalty, exponent, length, alpha, gamma)
+                q.lrn(epsilons[episode], episode, penalty, exponent, length,
+                        alphas[episode], gammas[episode])
 
                 # Record descriptive statistics at each resolution step
                 if episode % resolution == 0:
-                    timestep_reward[dp] = np.average(
-                            q.timestep_reward_res)
-                    timestep_reward_min[dp] = np.min(
-                            q.timestep_reward_res)
-                    timestep_reward_max[dp] = np.max(
-                            q.timestep_reward_res)
-                    timestep_reward_up_q[dp] = np.percentile(
-                            q.timestep_reward_res, 75)
-                    timestep_reward_low_q[dp] = np.percentile(
-                            q.timestep_reward_res, 25)
+                    curve[:, dp] = q.window.stats()
                     dp += 1
             
 
@@ -95,11 +64,8 @@ def do(q, runs, episodes, bins, resolution, dataPoints, profileFlag, eDecayFlag,
         # Record aggregate values over total run length
         aggr_rewards[r] = np.mean(avg_rwd)
         aggr_stds[r] = std_rwd
-        aggr_ts_r[r] = timestep_reward
-        aggr_ts_r_min[r] = timestep_reward_min
-        aggr_ts_r_max[r] = timestep_reward_max
-        aggr_ts_r_uq[r] = timestep_reward_up_q
-        aggr_ts_r_lq[r] = timestep_reward_low_q
+        aggr_ts_r[r], aggr_ts_r_min[r], aggr_ts_r_max[r], aggr_ts_r_uq[r],\
+                aggr_ts_r_lq[r] = curve
         
         # Check is profiling flag is set
         if profileFlag:
@@ -0,0 +1,105 @@
+import numpy as np
+from timeit import default_timer as timer
+
+import schedKew
+
+# Train and test <lanes> Q-tables together using the batched methods of the
+#   Q-learning class, returning the test results and learning curves of every
+#   lane
+def lrnBatch(q, lanes, episodes, resolution, eDecayFlag, gamma, alpha,
+        epsilon, epsilonDecay, eDecayStart, eDecayEnd, eDecayRate, eDecayExp,
+        aDecayFlag, gDecayFlag, penalty, exponent, length):
+
+    # Calculate the epsilon, alpha and gamma of each episode, taken by every
+    #   lane for the episode it is on
+    epsilons, alphas, gammas = schedKew.schedule(episodes, eDecayFlag, gamma,
+            alpha, epsilon, epsilonDecay, eDecayStart, eDecayEnd, eDecayRate,
+            eDecayExp, aDecayFlag, gDecayFlag)
+
+    # Reset environment lanes and the stack of Q-tables
+    q.init_batch(resolution, lanes)
+
+    # Perform learning for every episode in every lane, recording the
+    #   descriptive statistics of every lane at each resolution step
+    curve = q.lrn_batch(episodes, epsilons, alphas, gammas, penalty, exponent,
+            length)
+
+    # Perform testing on every trained Q table after episodes are completed
+    avg_rwd, std_rwd = q.test_batch()
+
+    return (avg_rwd, std_rwd, *curve)
+
+# Batched equivalent of do.do, training every run at once in a single stack
+#   of Q-tables and returning the same aggregate arrays. Requires a built-in
+#   NumPy environment and rendering is not supported
+def do(q, runs, episodes, resolution, dataPoints, profileFlag, eDecayFlag,
+        gamma, alpha, epsilon, decay, epsilonDecay, eDecayStart, eDecayEnd,
+        eDecayRate, eDecayExp, aDecayFlag, gDecayFlag, penalty, exponent,
+        length, renderFlag):
+
+    # Start split timer for the runs
+    start_split = timer()
+
+    # Train and test each run as a lane of the batch
+    aggr_rewards, aggr_stds, aggr_ts_r, aggr_ts_r_min, aggr_ts_r_max,\
+            aggr_ts_r_uq, aggr_ts_r_lq = lrnBatch(q, runs, episodes,
+            resolution, eDecayFlag, gamma, alpha, epsilon, epsilonDecay,
+            eDecayStart, eDecayEnd, eDecayRate, eDecayExp, aDecayFlag,
+            gDecayFlag, penalty, exponent, length)
+
+    # Check is profiling flag is set
+    if profileFlag:
+        # Calculate split (total runs) time and report profiling values
+        end_split = timer()
+        segment = end_split - start_split
+        for r in range(runs):
+            print('Run:', r)
+            print(f'Average reward:{aggr_rewards[r]}, std:{aggr_stds[r]}')
+        print('Split time:', segment)
+        print('#--------========--------#')
+
+    # Return aggregate statistics over total length of runs
+    return aggr_rewards, aggr_stds, aggr_ts_r, aggr_ts_r_min, aggr_ts_r_max,\
+            aggr_ts_r_uq, aggr_ts_r_lq
+
+# Batched equivalent of doBin.do, training every bin of every run at once and
+#   averaging the test rewards over the bins of each run. Learning curves and
+#   standard deviations are taken from the last bin of each run as in doBin
+def doBin(q, runs, episodes, bins, resolution, dataPoints, profileFlag,
+        eDecayFlag, gamma, alpha, epsilon, decay, epsilonDecay, eDecayStart,
+        eDecayEnd, eDecayRate, eDecayExp, aDecayFlag, gDecayFlag, penalty,
+        exponent, length, renderFlag):
+
+    # Start split timer for the runs
+    start_split = timer()
+
+    # Train and test each bin of each run as a lane of the batch
+    avg_rwd, std_rwd, ts_r, ts_r_min, ts_r_max, ts_r_uq, ts_r_lq =\
+            lrnBatch(q, runs * bins, episodes, resolution, eDecayFlag, gamma,
+            alpha, epsilon, epsilonDecay, eDecayStart, eDecayEnd, eDecayRate,
+            eDecayExp, aDecayFlag, gDecayFlag, penalty, exponent, length)
+
+    # Record aggregate values over total run length
+    aggr_rewards = np.mean(avg_rwd.reshape(runs, bins), axis=1)
+    aggr_stds = std_rwd.reshape(runs, bins)[:, -1]
+    aggr_ts_r = ts_r.reshape(runs, bins, -1)[:, -1]
+    aggr_ts_r_min = ts_r_min.reshape(runs, bins, -1)[:, -1]
+    aggr_ts_r_max = ts_r_max.reshape(runs, bins, -1)[:, -1]
+    aggr_ts_r_uq = ts_r_uq.reshape(runs, bins, -1)[:, -1]
+    aggr_ts_r_lq = ts_r_lq.reshape(runs, bins, -1)[:, -1]
+
+    # Check is profiling flag is set
+    if profileFlag:
+        # Calculate split (total runs) time and report profiling values
+        end_split = timer()
+        segment = end_split - start_split
+        for r in range(runs):
+            print('Run:', r)
+            print(f'Average reward:{avg_rwd.reshape(runs, bins)[r]},'
+                    f' std:{aggr_stds[r]}')
+        print('Split time:', segment)
+        print('#--------========--------#')
+
+    # Return aggregate statistics over total length of runs
+    return aggr_rewards, aggr_stds, aggr_ts_r, aggr_ts_r_min, aggr_ts_r_max,\
+            aggr_ts_r_uq, aggr_ts_r_lq
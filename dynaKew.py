@@ -0,0 +1,174 @@
+import numpy as np
+
+from sinKew import SinKew
+
+# Q-learning class with Dyna-Q planning, learning a tabular model of the
+#   environment from the real transitions and replaying it between real steps.
+#   The model holds the next state index, reward and completion of the last
+#   transition from every flat state-action index in arrays allocated once,
+#   along with the list of indices seen. After each real step planning samples
+#   that many seen pairs and applies one Bellman update to all of them at once
+#   from the model, so each environment step is reused for many cheap updates
+class DynaKew(SinKew):
+    def __init__(self, init, pol, env, cOS, cAS, dis, maxS, nTst, gDec, ver,
+            rTst, rTrn, npEnv=False, seed=None, planning=10):
+        super().__init__(init, pol, env, cOS, cAS, dis, maxS, nTst, gDec, ver,
+                rTst, rTrn, npEnv, seed)
+        if self.polS or self.polN:
+            raise ValueError('Planning is available for the q_lrn and'
+                    ' expected_sarsa policies only')
+
+        # The planning pairs are sampled without their encounter counts, so
+        #   gamma decay by encounters cannot be applied to their updates
+        if gDec:
+            raise ValueError('Gamma decay by encounters is not available with'
+                    ' planning')
+
+        # Set number of planning updates per real step
+        self.planning = planning
+
+        # Model arrays, allocated for the table of the first run
+        self.mNext = None
+
+    # Initialize environment, Q-table and an empty model
+    def init_env(self, resolution):
+        super().init_env(resolution)
+
+        size = self.Qf.size
+        if self.mNext is None or self.mNext.size != size:
+            self.mNext = np.zeros(size, dtype=np.int64)
+            self.mReward = np.zeros(size)
+            self.mDone = np.zeros(size, dtype=bool)
+            self.mSeen = np.zeros(size, dtype=bool)
+            self.mIndex = np.zeros(size, dtype=np.int64)
+        self.mSeen.fill(False)
+        self.mCount = 0
+
+        return
+
+    # Batched training has no model
+    def init_batch(self, resolution, runs):
+        raise ValueError('Batched training is not available with planning')
+
+    # Record the transition from flat state-action index i in the model
+    def remember(self, i, s_, reward, done):
+        if not self.mSeen[i]:
+            self.mSeen[i] = True
+            self.mIndex[self.mCount] = i
+            self.mCount += 1
+
+        self.mNext[i] = s_
+        self.mReward[i] = reward
+        self.mDone[i] = done
+
+    # Apply one Bellman update to a sample of the seen state-action pairs from
+    #   their modelled transitions, with every target taken from the table
+    #   before the update and the penalty as next SA value for completions,
+    #   then refresh the greedy cache of the changed rows
+    def plan(self, epsilon, penalty, alpha, gamma):
+        if self.mCount == 0 or self.planning == 0: return
+
+        Qv = self.Qf.reshape(-1)
+        idx = self.mIndex[self.rng.gen.integers(0, self.mCount,
+            self.planning)]
+
+        # Value of the modelled next state, by its maximum or its expected
+        #   value under the e-greedy policy
+        rows = self.Qf[self.mNext[idx]]
+        future = np.max(rows, axis=1)
+        if self.polE: future = epsilon / self.action_n * rows.sum(axis=1)\
+                + (1 - epsilon) * future
+        future[self.mDone[idx]] = penalty
+
+        Qv[idx] = Qv[idx] + alpha * (self.mReward[idx] + gamma * future\
+                - Qv[idx])
+
+        # Refresh the greedy action and maximum of each changed row
+        s = np.unique(idx // self.action_n)
+        G = np.argmax(self.Qf[s], axis=1)
+        M = self.Qf[s, G]
+        for s, g, m in zip(s.tolist(), G.tolist(), M.tolist()):
+            self.greedy.G[s] = g
+            self.greedy.M[s] = m
+
+    # Perform training on the Q table for the given environment, called once per
+    #   episode taking variables to control the training process
+    def lrn(self, epsilon, episode, penalty, exponent, length, alpha, gamma):
+
+        # Set vars used for checks in training
+        steps = 0
+        maxS = False
+        done = False
+        render = False
+
+        # Create value for recording total reward per epidode
+        total_reward = 0
+
+        # Reset environment for new episode and get initial discretized state
+        if self.cont_os: d_s = self.get_discrete_state(self.env.reset())
+        else:
+            s = self.env.reset()
+            d_s = s
+
+        # Report episode and epsilon and set the episode to be rendered
+        #   if the resolution is reached
+        if episode % self.resolution == 0 and episode != 0:
+            if self.verboseFlag: print(episode, epsilon)
+            if self.renderTrain: render = True
+
+        # Loop the task until task is completed or max steps are reached
+        while not done:
+            steps += 1
+            if render: self.env.render()
+
+            # Get action using e-Greedy method
+            a, d_a = self.e_greedy(epsilon, d_s)
+
+            # Get next state from the chosen action and record reward
+            s_, reward, done, info = self.env.step(a)
+            total_reward += reward
+
+            # Discretise state if observation space is continuous
+            if self.cont_os: d_s_ = self.get_discrete_state(s_)
+            else: d_s_ = s_
+
+            # If max steps have been exceeded set episode to complete
+            if maxS: done = True
+
+            # Update Q-value with Bellman Equation by the maximum or expected
+            #   value of the next state, or with the penalty if the task is
+            #   completed and max steps were not reached, and record the
+            #   transition in the model. Steps cut off by max steps are not
+            #   modelled as they are not completions
+            i = d_s * self.action_n + d_a
+            if not done:
+                future = self.greedy.M[d_s_]
+                if self.polE: future = self.expected(epsilon, d_s_, future)
+                self.update_flat(i, reward + gamma * future, alpha)
+                self.remember(i, d_s_, reward, False)
+            elif not maxS:
+                self.update_flat(i, reward + gamma * penalty, alpha)
+                self.remember(i, d_s_, reward, True)
+
+            # Replay the model between real steps
+            self.plan(epsilon, penalty, alpha, gamma)
+
+            if done:
+                # Record total reward in the rolling window
+                self.window.record(total_reward)
+
+                # Print resolution results if verbose flag is set
+                if self.verboseFlag and episode % self.resolution == 0\
+                        and episode != 0:
+                    print(*self.window.stats()[:3])
+
+                # Close the render of the episode if rendered
+                if render: self.env.close()
+
+            # Set next state to current state
+            d_s = d_s_
+
+            # If max steps are reached complete episode and set max step flag
+            if steps == self.maxSteps: maxS = True
+
+        return
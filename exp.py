@@ -2,8 +2,9 @@
 import numpy as np
 from timeit import default_timer as timer
 
-# Import control script
+# Import control scripts
 import do as d
+import doVec
 # Import plotting functions
 import plotKew as plt
 # Import single and double Q-Learning classes
@@ -46,6 +47,12 @@ renderTrain = False
 # Set openai gym environment (CartPole and MountainCar have been tested)
 #environment = 'CartPole-v1'     # CartPole-v1, MountainCar-v0
 environment = 'MountainCar-v0'
+# Use the built-in NumPy simulator in place of the gym environment
+npEnv = False
+# Train every run at once in a stack of Q-tables (built-in environments only)
+batchFlag = False
+# Directory to save plots to as PNG and SVG files rather than showing them
+plotDir = None
 
 # Flags for continuous observation and action spaces
 contOS = True
@@ -104,10 +111,13 @@ start = timer()
 # Initialise double or single QL class with the doubleFlag value provided
 if doubleFlag: q = DblKew(initialisation, policy, environment, contOS, contAS,
             discretisation, maxSteps, nTests, gDecayEncounter, verboseFlag,
-            renderTest, renderTrain)
+            renderTest, renderTrain, npEnv)
 else: q = SinKew(initialisation, policy, environment, contOS, contAS,
             discretisation, maxSteps, nTests, gDecayEncounter, verboseFlag,
-            renderTest, renderTrain)
+            renderTest, renderTrain, npEnv)
+
+# Select the batched control script if the batch flag is set
+if batchFlag: d = doVec
 
 # Run experiment passing relevent variables to do script to run QL,
 #   recording performance of tests and training for plotting
@@ -142,7 +152,9 @@ print('Discretisation Factor:', discretisation)
 print('Method used:', policy)
 print('Double?:', doubleFlag)
 print('Environment:', environment)
-input('sho')
+# Save plots to files if a directory is set, otherwise wait for input to show
+if plotDir is not None: plt.headless(plotDir, ('png', 'svg'))
+if plt.interactive(): input('Show plots')
 plt.plotStd(aggr_rewards, aggr_stds)
 plt.plot(np.mean(aggr_ts_r, axis=0), np.mean(aggr_ts_r_min, axis=0),
             np.mean(aggr_ts_r_max, axis=0), np.mean(aggr_ts_r_uq, axis=0),
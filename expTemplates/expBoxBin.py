@@ -104,6 +104,9 @@ values = [20, 21, 35, 36, 50, 51]
 aggr_rewards = [None] * experiments
 avg = [None] * experiments
 
+# Directory to save plots to as PNG and SVG files rather than showing them
+plotDir = None
+
 # Iterate through each experimental value and run Q-learning
 for e in range(experiments):
 
@@ -165,8 +168,9 @@ print('Discretisation Factor:', discretisation)
 print('Method used:', policy)
 print('Double?:', doubleFlag)
 print('Environment:', environment)
-# Wait for input to show plot
-input('Show plots')
+# Save plots to files if a directory is set, otherwise wait for input to show
+if plotDir is not None: plt.headless(plotDir, ('png', 'svg'))
+if plt.interactive(): input('Show plots')
 print(values)
 data = aggr_rewards
 plt.boxPlot(data, avg, ind)
@@ -1,9 +1,10 @@
 # Import numpy for array managment and timeit to time execution
-import math
 import numpy as np
 from timeit import default_timer as timer
 
-import multiprocessing as mp
+# Import control script and the pool executor for parallel execution
+import doBin as d
+import poolKew
 
 # Import plotting functions
 import plotKew as plt
@@ -11,120 +12,6 @@ import plotKew as plt
 from sinKew import SinKew
 from dblKew import DblKew
 
-# Incorporated control script for parallell execution
-# Function to run the various elements of training and testing of a Q-table
-def do(q, runs, episodes, bins, resolution, dataPoints, profileFlag, eDecayFlag,
-        gamma, alpha, epsilon, decay, epsilonDecay, eDecayStart, eDecayEnd,
-        eDecayRate, eDecayExp, aDecayFlag, gDecayFlag, penalty, exponent,
-        length, renderFlag, e, queue):
-
-    # Create aggregate arrays to store values for run length
-    aggr_rewards = np.zeros(runs)
-    aggr_stds = np.zeros(runs)
-    aggr_ts_r = np.zeros((runs, int(dataPoints)))
-    aggr_ts_r_min = np.zeros((runs, int(dataPoints)))
-    aggr_ts_r_max = np.zeros((runs, int(dataPoints)))
-    aggr_ts_r_uq = np.zeros((runs, int(dataPoints)))
-    aggr_ts_r_lq = np.zeros((runs, int(dataPoints)))
-
-    # Calculate decay esponent -TODO:change division to variable
-    if eDecayFlag and eDecayExp: exp = 1 / (episodes / 5)
-    
-    # Iterate through each run
-    for r in range(runs):
-        # Create array to store rewards for bin length and iterate bins
-        avg_rwd = np.zeros(bins)
-        
-        # Start split timer for each run
-        start_split = timer()
-            
-        for b in range(bins):
-            # Reset datapoints iterator for each run
-            dp = 0
-
-            # Create arrays to store timestep values for profiling training
-            timestep_reward = np.zeros(int(dataPoints))
-            timestep_reward_min = np.zeros(int(dataPoints))
-            timestep_reward_max = np.zeros(int(dataPoints))
-            timestep_reward_up_q = np.zeros(int(dataPoints))
-            timestep_reward_low_q = np.zeros(int(dataPoints))
-
-            # Reset environment and Q-tables
-            q.init_env(resolution)
-            
-            # Reset decaying epsilon to starting value
-            if eDecayFlag and not eDecayExp: epsilon = epsilonDecay
-
-            # Iterate through each episode in a run
-            for episode in range(episodes):
-                #episode += 1
-                
-                # Check for epsilon decay flag
-                if eDecayFlag:
-                    # Check for linear epsilon decay
-                    if not eDecayExp:
-                        # Decay epsilon values during epsilon decay range
-                        if eDecayEnd >= episode >= eDecayStart:
-                            epsilon -= eDecayRate
-                            # Prevent epsilon from going negative
-                            if epsilon < 0:
-                                epsilon = 0
-                    # Check for exponential decay and calculate from episode
-                    elif eDecayExp: epsilon = 0.5 * math.exp(-exp * episode)
-
-                # Check alpha decay flag and set alpha according episode
-                if aDecayFlag:
-                    alpha = math.exp(-exp * episode)
-                # Also for gamma -TODO:replace hardcoded intersect values
-                if gDecayFlag:
-                    gamma = 1 + -math.exp(-exp * episode)
-                
-                # Perform learning for each episode
-                q.lrn(epsilon, episode, penalty, exponent, length, alpha, gamma)
-
-                # Record descriptive statistics at each resolution step
-                if episode % resolution == 0:
-                    timestep_reward[dp] = np.average(
-                            q.timestep_reward_res)
-                    timestep_reward_min[dp] = np.min(
-                            q.timestep_reward_res)
-                    timestep_reward_max[dp] = np.max(
-                            q.timestep_reward_res)
-                    timestep_reward_up_q[dp] = np.percentile(
-                            q.timestep_reward_res, 75)
-                    timestep_reward_low_q[dp] = np.percentile(
-                            q.timestep_reward_res, 25)
-                    dp += 1
-            
-            # Check if testing is to be rendered and if so wait for user input
-            if renderFlag: input('Start testing (rendered)')
-            # Perform testing on trained Q table after episodes are completed
-            avg_rwd[b], std_rwd = q.test_qtable() 
-     
-        # Record aggregate values over total run length
-        aggr_rewards[r] = np.mean(avg_rwd)
-        aggr_stds[r] = std_rwd
-        aggr_ts_r[r] = timestep_reward
-        aggr_ts_r_min[r] = timestep_reward_min
-        aggr_ts_r_max[r] = timestep_reward_max
-        aggr_ts_r_uq[r] = timestep_reward_up_q
-        aggr_ts_r_lq[r] = timestep_reward_low_q
-        
-        # Check is profiling flag is set
-        if profileFlag:
-            # Calculate split (total runs) time and report profiling values
-            end_split = timer()
-            segment = end_split - start_split
-            print('Run:', r)
-            print(f'Average reward:{avg_rwd}, std:{std_rwd}')
-            print('Split time:', segment)
-            print('#--------========--------#')
-
-    # Record rewards into multithreaded queue
-    queue[e].put(aggr_rewards)
-
-    return True
-
 # Set initialisation policy for Q-table
 initialisation = 'uniform'      # uniform, ones, zeros
 
@@ -223,65 +110,69 @@ val2 = [False, False, True, True]
 rwds = [None] * experiments
 avgs = [None] * experiments
 
-threads = []
-
-queue = [mp.Queue()] * experiments
-
-# Iterate through each experimental value and run Q-learning
-for e in range(experiments):
-    # Chenge value to the correponding hyper-parameter
-    policy = val1[e]
-    doubleFlag = val2[e]
-    #discretisation = val3[e]
-
-    # Calculate the decay period
-    eDecayStart = 1
-    eDecayEnd = episodes // decay
-    # Calculate decay rate
-    eDecayRate = epsilonDecay / eDecayEnd
-
-    # Create number of individual data points for run length
-    dataPoints = episodes / resolution
-
-    # Initialise double or single QL class with the doubleFlag value provided
-    if doubleFlag: q = DblKew(initialisation, policy, environment, contOS,
-                contAS, discretisation, maxSteps, nTests, gDecayEncounter,
-                verboseFlag, renderTest, renderTrain)
-    else: q = SinKew(initialisation, policy, environment, contOS, contAS,
-                discretisation, maxSteps, nTests, gDecayEncounter, verboseFlag,
-                renderTest, renderTrain)
-
-    # Run experiment passing relevent variables to do script to run QL,
-    #   as a multithreading process
-    process = mp.Process(target=do, args=(q, runs, episodes, bins, resolution,
-            dataPoints, profileFlag, eDecayFlag, gamma, alpha, epsilon, decay,
-            epsilonDecay, eDecayStart, eDecayEnd, eDecayRate, eDecayExp,
-            aDecayFlag, gDecayFlag, penalty, exponent, length, renderTest, e,
-            queue,))
-
-    process.start()
-    threads.append(process)
-    
-e = 0
-for process in threads:
-    rwds[e] = queue[e].get()
-    process.join()
-    e += 1
-
-for e in range(experiments):
-    avgs[e] = np.average(rwds[e])
-
-# End timer and print time
-end = timer()
-print('Time:', end-start)
-print('Environment:', environment)
-# Wait for input to show plot
-input('Show plots')
-
-print(val1)
-print(val2)
-#print(val3)
-print(avgs, ind) 
-
-plt.boxPlot(rwds, avgs, ind)
+# Number of worker processes for the sweep (None uses every core)
+workers = None
+# Directory to save plots to as PNG and SVG files rather than showing them
+plotDir = None
+
+# Run the experiments in the main process only, as worker processes started
+#   by spawn import this script
+if __name__ == '__main__':
+    # List of experiments to be executed by the pool of workers
+    jobs = []
+
+    # Iterate through each experimental value and run Q-learning
+    for e in range(experiments):
+        # Chenge value to the correponding hyper-parameter
+        policy = val1[e]
+        doubleFlag = val2[e]
+        #discretisation = val3[e]
+
+        # Calculate the decay period
+        eDecayStart = 1
+        eDecayEnd = episodes // decay
+        # Calculate decay rate
+        eDecayRate = epsilonDecay / eDecayEnd
+
+        # Create number of individual data points for run length
+        dataPoints = episodes / resolution
+
+        # Initialise double or single QL class with the doubleFlag value
+        #   provided
+        if doubleFlag: q = DblKew(initialisation, policy, environment, contOS,
+                    contAS, discretisation, maxSteps, nTests, gDecayEncounter,
+                    verboseFlag, renderTest, renderTrain)
+        else: q = SinKew(initialisation, policy, environment, contOS, contAS,
+                    discretisation, maxSteps, nTests, gDecayEncounter,
+                    verboseFlag, renderTest, renderTrain)
+
+        # Add experiment passing relevent variables to do script to run QL
+        jobs.append((q, d.do, (episodes, bins, resolution, dataPoints,
+                profileFlag, eDecayFlag, gamma, alpha, epsilon, decay,
+                epsilonDecay, eDecayStart, eDecayEnd, eDecayRate, eDecayExp,
+                aDecayFlag, gDecayFlag, penalty, exponent, length, renderTest)))
+
+    # Execute the runs of every experiment in chunks across the pool of workers,
+    #   results are returned in experiment order
+    results = poolKew.sweep(jobs, runs, dataPoints, workers)
+
+    for e in range(experiments):
+        rwds[e] = results[e][0]
+        avgs[e] = np.average(rwds[e])
+
+    # End timer and print time
+    end = timer()
+    print('Time:', end-start)
+    print('Environment:', environment)
+    # Save plots to files if a directory is set, otherwise wait for input to
+    #   show them
+    if plotDir is not None: plt.headless(plotDir, ('png', 'svg'))
+    if plt.interactive(): input('Show plots')
+
+    print(val1)
+    print(val2)
+    #print(val3)
+    print(avgs, ind) 
+
+    plt.boxPlot(rwds, avgs, ind)
 
@@ -34,6 +34,8 @@ renderTrain = False
 
 # Set openai gym environment (CartPole and MountainCar have been tested)
 environment = 'CartPole-v1'     # CartPole-v1, MountainCar-v0
+# Directory to save plots to as PNG and SVG files rather than showing them
+plotDir = None
 
 # Flags for continuous observation and action spaces
 contOS = True
@@ -136,6 +138,8 @@ data = aggr_rewards
 row = 1
 col = 1
 experiments = 1
-input('hostograme')
+# Save plots to files if a directory is set, otherwise wait for input to show
+if plotDir is not None: plt.headless(plotDir, ('png', 'svg'))
+if plt.interactive(): input('Show plots')
 print(np.max(q.N))
 plt.hist(data)
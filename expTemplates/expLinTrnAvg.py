@@ -34,6 +34,8 @@ renderTrain = False
 
 # Set openai gym environment (CartPole and MountainCar have been tested)
 environment = 'CartPole-v1'     # CartPole-v1, MountainCar-v0
+# Directory to save plots to as PNG and SVG files rather than showing them
+plotDir = None
 
 # Flags for continuous observation and action spaces
 contOS = True
@@ -98,6 +100,9 @@ values = [100, 250, 500, 750, 1000, 1500]
 # List of values to be revorded and compared in boxplot
 aggr_rewards = [None] * experiments
 
+# Save plots to files if a directory is set
+if plotDir is not None: plt.headless(plotDir, ('png', 'svg'))
+
 # Iterate through each experimental value and run Q-learning
 for e in range(experiments):
 
@@ -139,10 +144,12 @@ for e in range(experiments):
     if logFlag: print('Exponential penalties exponent:', exponent, 'Length:',
             length)
     print('------------==========================------------')
-    input('Show plots')
+    # Wait for input to show the plot of each experiment, or save it under
+    #   the number of the experiment
+    if plt.interactive(): input('Show plots')
     plt.plot(np.mean(aggr_ts_r, axis=0), np.mean(aggr_ts_r_min, axis=0),
             np.mean(aggr_ts_r_max, axis=0), np.mean(aggr_ts_r_uq, axis=0),
-            np.mean(aggr_ts_r_lq, axis=0))
+            np.mean(aggr_ts_r_lq, axis=0), f'curves{e}')
 
 # End timer and print time
 end = timer()
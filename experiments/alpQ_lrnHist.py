@@ -69,6 +69,9 @@ experiments = 12
 aggr_rewards = [None] * experiments
 avg = [None] * experiments
 
+# Directory to save plots to as PNG and SVG files rather than showing them
+plotDir = None
+
 ind = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
 
 #decays = [0.0001, 0.001, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.125, 0.15, 0.175, 0.2]
@@ -117,7 +120,9 @@ print('Discretisation Factor:', discretisation)
 print('Method used:', policy)
 print('Double?:', doubleFlag)
 print(decays)
-input('Show plots')
+# Save plots to files if a directory is set, otherwise wait for input to show
+if plotDir is not None: plt.headless(plotDir, ('png', 'svg'))
+if plt.interactive(): input('Show plots')
 data = aggr_rewards
 #plt.boxPlot(data, avg, ind)
 row = int(math.floor(math.sqrt(experiments)))
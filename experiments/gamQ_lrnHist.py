@@ -69,6 +69,9 @@ experiments = 12
 aggr_rewards = [None] * experiments
 avg = [None] * experiments
 
+# Directory to save plots to as PNG and SVG files rather than showing them
+plotDir = None
+
 ind = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
 
 #decays = [0.99999, 0.9999, 0.9995, 0.999, 0.9975, 0.995, 0.9925, 0.99, 0.975, 0.95, 0.925, 0.9]
@@ -117,7 +120,9 @@ print('Discretisation Factor:', discretisation)
 print('Method used:', policy)
 print('Double?:', doubleFlag)
 print(decays)
-input('Show plots')
+# Save plots to files if a directory is set, otherwise wait for input to show
+if plotDir is not None: plt.headless(plotDir, ('png', 'svg'))
+if plt.interactive(): input('Show plots')
 data = aggr_rewards
 #plt.boxPlot(data, avg, ind)
 row = int(math.floor(math.sqrt(experiments)))
@@ -44,6 +44,8 @@ renderTrain = False
 # Set openai gym environment (CartPole and MountainCar have been tested)
 #environment = 'CartPole-v1'     # CartPole-v1, MountainCar-v0
 environment = 'MountainCar-v0'
+# Use the built-in NumPy simulator in place of the gym environment
+npEnv = False
 
 # Flags for continuous observation and action spaces
 contOS = True
@@ -104,6 +106,9 @@ values = [20, 21, 35, 36, 50, 51]
 aggr_rewards = [None] * experiments
 avg = [None] * experiments
 
+# Directory to save plots to as PNG and SVG files rather than showing them
+plotDir = None
+
 # Iterate through each experimental value and run Q-learning
 for e in range(experiments):
 
@@ -122,10 +127,10 @@ for e in range(experiments):
     # Initialise double or single QL class with the doubleFlag value provided
     if doubleFlag: q = DblKew(initialisation, policy, environment, contOS,
                 contAS, discretisation, maxSteps, nTests, gDecayEncounter, verboseFlag,
-                renderTest, renderTrain)
+                renderTest, renderTrain, npEnv)
     else: q = SinKew(initialisation, policy, environment, contOS, contAS,
                 discretisation, maxSteps, nTests, gDecayEncounter, verboseFlag,
-                renderTest, renderTrain)
+                renderTest, renderTrain, npEnv)
 
     # Run experiment passing relevent variables to do script to run QL,
     #   recording performance of tests and training for plotting
@@ -165,8 +170,9 @@ print('Discretisation Factor:', discretisation)
 print('Method used:', policy)
 print('Double?:', doubleFlag)
 print('Environment:', environment)
-# Wait for input to show plot
-input('Show plots')
+# Save plots to files if a directory is set, otherwise wait for input to show
+if plotDir is not None: plt.headless(plotDir, ('png', 'svg'))
+if plt.interactive(): input('Show plots')
 print(values)
 data = aggr_rewards
 plt.boxPlot(data, avg, ind)
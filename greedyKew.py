@@ -0,0 +1,73 @@
+import numpy as np
+
+# Cache of the greedy action G and maximum value M of every row of a flat
+#   q-table, or of the sum of a pair of tables for double Q-learning. The cache
+#   is updated incrementally after each change to a single state-action value,
+#   rescanning the row only when the value of its greedy action decreases, so
+#   action selection and the maximum of a row become O(1) lookups. Ties are
+#   resolved to the lowest action, matching np.argmax
+class GreedyCache:
+    def __init__(self, Q, Q2=None):
+        self.Q = Q
+        self.Q2 = Q2
+
+        # Held as lists of Python numbers which are cheaper to index and
+        #   compare one at a time than numpy scalars
+        values = Q if Q2 is None else Q + Q2
+        G = np.argmax(values, axis=1)
+        self.G = G.tolist()
+        self.M = values[np.arange(len(values)), G].tolist()
+
+    # Update the cache after the value of action a in state s has changed
+    def update(self, s, a):
+        if self.Q2 is None: q = self.Q[s, a]
+        else: q = self.Q[s, a] + self.Q2[s, a]
+
+        m = self.M[s]
+        g = self.G[s]
+        if q > m or (q == m and a < g):
+            self.G[s] = a
+            self.M[s] = q
+        # Rescan the row if the greedy action is no longer known to be greatest
+        elif a == g and q < m:
+            if self.Q2 is None: row = self.Q[s].tolist()
+            else: row = (self.Q[s] + self.Q2[s]).tolist()
+            m = max(row)
+            self.G[s] = row.index(m)
+            self.M[s] = m
+
+    # Greedy action of every state as an array
+    def policy(self):
+        return np.array(self.G)
+
+# Greedy action and maximum value of the row of n actions starting at index j
+#   of a flat table of Python floats (e.g. a memoryview of a q-table), with
+#   the comparisons unrolled for the common 2 and 3 actions, or of the row of
+#   the sum of a pair of tables if Q2 is given. Ties are resolved to the
+#   lowest action, matching np.argmax
+def row_max(Q, j, n, Q2=None):
+    if Q2 is not None:
+        row = [x + y for x, y in zip(Q[j:j + n].tolist(),
+            Q2[j:j + n].tolist())]
+        m = max(row)
+        return row.index(m), m
+
+    if n == 2:
+        q0 = Q[j]
+        q1 = Q[j + 1]
+        if q1 > q0: return 1, q1
+        return 0, q0
+
+    if n == 3:
+        g = 0
+        m = Q[j]
+        q = Q[j + 1]
+        if q > m: g, m = 1, q
+        q = Q[j + 2]
+        if q > m: g, m = 2, q
+        return g, m
+
+    row = Q[j:j + n].tolist()
+    m = max(row)
+
+    return row.index(m), m
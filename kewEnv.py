@@ -0,0 +1,236 @@
+import math
+import numpy as np
+
+# Bounds of a continuous observation space, mirroring the attributes of the gym
+#   Box space that are read by the Q-learning classes
+class Box:
+    def __init__(self, low, high):
+        self.low = np.array(low, dtype=np.float32)
+        self.high = np.array(high, dtype=np.float32)
+        self.shape = self.low.shape
+
+# Size of a discrete action space, mirroring the gym Discrete space
+class Discrete:
+    def __init__(self, n):
+        self.n = n
+
+# Scalar maths used by the dynamics when a single lane is simulated, so plain
+#   Python floats are used in the same way as the gym environments
+class ScalarOps:
+    cos = staticmethod(math.cos)
+    sin = staticmethod(math.sin)
+
+    @staticmethod
+    def clip(v, low, high): return min(max(v, low), high)
+
+    @staticmethod
+    def where(cond, a, b): return a if cond else b
+
+# Array maths used by the dynamics when N lanes are simulated at once
+class ArrayOps:
+    cos = staticmethod(np.cos)
+    sin = staticmethod(np.sin)
+    clip = staticmethod(np.clip)
+    where = staticmethod(np.where)
+
+# Base class for the NumPy environments. With n=None a single lane is simulated
+#   with the same interface as gym.make(environment).env so it can be used as a
+#   drop-in by the Q-learning classes, otherwise n independent lanes are reset
+#   and stepped together using arrays of states, actions, rewards and dones.
+#   Batched lanes are truncated after maxSteps steps if it is given and with the
+#   autoReset flag every lane that finishes is reset on its own so the batch
+#   stays full, otherwise finished lanes are frozen until the next reset
+class KewEnv:
+    def __init__(self, n=None, seed=None, autoReset=False, maxSteps=None):
+        self.n = n
+        self.batched = n is not None
+        self.lanes = n if self.batched else 1
+        self.autoReset = autoReset
+        self.maxSteps = maxSteps
+        self.np_random = np.random.default_rng(seed)
+
+        self.state = np.zeros((self.lanes, self.obs_dim))
+        self.done = np.zeros(self.lanes, dtype=bool)
+        self.steps = np.zeros(self.lanes, dtype=np.int64)
+
+    # Reseed the random generator of the initial states, as for gym seed
+    def seed(self, seed=None):
+        self.np_random = np.random.default_rng(seed)
+
+    # Reset every lane and return the initial observations
+    def reset(self):
+        self.state = self.reset_lanes(self.lanes)
+        self.done[:] = False
+        self.steps[:] = 0
+
+        if self.batched: return self.state.copy()
+
+        # Keep a single lane as a tuple of floats to step it without arrays
+        self.s = tuple(self.state[0].tolist())
+        return self.state[0].copy()
+
+    # Apply actions to the environment returning the next observations, rewards,
+    #   done flags and an info dict in the gym format (arrays when batched)
+    def step(self, action):
+        if not self.batched:
+            state_, reward, done = self.dynamics(ScalarOps, *self.s, action)
+            self.s = state_
+
+            # Give no reward for steps taken after the task was completed
+            if self.done[0]: reward = 0.0
+            self.done[0] = self.done[0] or done
+
+            return np.array(state_), reward, bool(done), {}
+
+        action = np.asarray(action)
+        state_, reward, done = self.dynamics(ArrayOps, *self.state.T, action)
+        state_ = np.stack(state_, axis=1)
+        info = {}
+
+        if self.autoReset: return self.step_reset(state_, reward, done, info)
+
+        # Only advance lanes that are still running
+        live = ~self.done
+        self.state[live] = state_[live]
+        reward = np.where(live, reward, 0.0)
+        self.steps += live
+
+        # Lanes finishing on this step, by task completion or by truncation
+        done = live & done
+        if self.maxSteps is not None:
+            info['truncated'] = live & ~done & (self.steps >= self.maxSteps)
+            done |= info['truncated']
+        self.done |= done
+
+        return self.state.copy(), reward, self.done.copy(), info
+
+    # Advance every lane of an environment whose lanes reset on their own, as
+    #   no lane is ever frozen, and reset the lanes finishing on this step by
+    #   task completion or by truncation in place, keeping their final
+    #   observations. The done flags returned are of the lanes that finished
+    def step_reset(self, state_, reward, done, info):
+        self.steps += 1
+
+        ended = done
+        if self.maxSteps is not None:
+            info['truncated'] = ~done & (self.steps >= self.maxSteps)
+            ended = done | info['truncated']
+
+        if ended.any():
+            info['terminal_observation'] = state_[ended]
+            state_[ended] = self.reset_lanes(np.count_nonzero(ended))
+            self.steps[ended] = 0
+        self.state = state_
+
+        return state_.copy(), np.full(self.lanes, reward), ended, info
+
+    # Rendering is not supported by the NumPy environments
+    def render(self):
+        return
+
+    def close(self):
+        return
+
+# Cart-pole balancing with the dynamics, termination thresholds and initial
+#   state distribution of gym 'CartPole-v1' (euler integration). Observation
+#   bounds use the same velocity clamps as SinKew.init_env
+class CartPole(KewEnv):
+    obs_dim = 4
+
+    gravity = 9.8
+    masscart = 1.0
+    masspole = 0.1
+    total_mass = masspole + masscart
+    length = 0.5
+    polemass_length = masspole * length
+    force_mag = 10.0
+    tau = 0.02
+
+    theta_threshold_radians = 12 * 2 * math.pi / 360
+    x_threshold = 2.4
+
+    def __init__(self, n=None, seed=None, autoReset=False, maxSteps=None):
+        high = [self.x_threshold * 2, 6, self.theta_threshold_radians * 2, 4]
+        self.observation_space = Box([-h for h in high], high)
+        self.action_space = Discrete(2)
+
+        super().__init__(n, seed, autoReset, maxSteps)
+
+    def reset_lanes(self, lanes):
+        return self.np_random.uniform(low=-0.05, high=0.05, size=(lanes, 4))
+
+    # Equations of motion for a step, shared by the scalar and array paths
+    def dynamics(self, ops, x, x_dot, theta, theta_dot, action):
+        force = ops.where(action == 1, self.force_mag, -self.force_mag)
+        costheta = ops.cos(theta)
+        sintheta = ops.sin(theta)
+        temp = (force + self.polemass_length * theta_dot * theta_dot *\
+                sintheta) / self.total_mass
+        thetaacc = (self.gravity * sintheta - costheta * temp) /\
+                (self.length * (4.0/3.0 - self.masspole * costheta *\
+                costheta / self.total_mass))
+        xacc = temp - self.polemass_length * thetaacc * costheta /\
+                self.total_mass
+
+        x = x + self.tau * x_dot
+        x_dot = x_dot + self.tau * xacc
+        theta = theta + self.tau * theta_dot
+        theta_dot = theta_dot + self.tau * thetaacc
+
+        done = (x < -self.x_threshold) | (x > self.x_threshold)\
+                | (theta < -self.theta_threshold_radians)\
+                | (theta > self.theta_threshold_radians)
+
+        return (x, x_dot, theta, theta_dot), 1.0, done
+
+# Car in a valley with the dynamics, goal and initial state distribution of
+#   gym 'MountainCar-v0'
+class MountainCar(KewEnv):
+    obs_dim = 2
+
+    min_position = -1.2
+    max_position = 0.6
+    max_speed = 0.07
+    goal_position = 0.5
+    goal_velocity = 0
+
+    force = 0.001
+    gravity = 0.0025
+
+    def __init__(self, n=None, seed=None, autoReset=False, maxSteps=None):
+        self.observation_space = Box([self.min_position, -self.max_speed],
+                [self.max_position, self.max_speed])
+        self.action_space = Discrete(3)
+
+        super().__init__(n, seed, autoReset, maxSteps)
+
+    def reset_lanes(self, lanes):
+        state = np.zeros((lanes, 2))
+        state[:, 0] = self.np_random.uniform(low=-0.6, high=-0.4, size=lanes)
+
+        return state
+
+    # Equations of motion for a step, shared by the scalar and array paths
+    def dynamics(self, ops, position, velocity, action):
+        velocity = velocity + ((action - 1) * self.force +\
+                ops.cos(3 * position) * (-self.gravity))
+        velocity = ops.clip(velocity, -self.max_speed, self.max_speed)
+        position = position + velocity
+        position = ops.clip(position, self.min_position, self.max_position)
+        velocity = ops.where((position == self.min_position) & (velocity < 0),
+                0.0, velocity)
+
+        done = (position >= self.goal_position)\
+                & (velocity >= self.goal_velocity)
+
+        return (position, velocity), -1.0, done
+
+# Built-in environments by gym id
+envs = {'CartPole-v1': CartPole, 'MountainCar-v0': MountainCar}
+
+# Create the NumPy environment for the given gym id, single lane if n is None
+def make(environment, n=None, seed=None, autoReset=False, maxSteps=None):
+    if environment not in envs:
+        raise ValueError(f'No NumPy environment for {environment}')
+
+    return envs[environment](n, seed, autoReset, maxSteps)
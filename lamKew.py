@@ -0,0 +1,204 @@
+import math
+import numpy as np
+
+from greedyKew import GreedyCache
+from sinKew import SinKew
+
+# Q-learning class with eligibility traces, training by Watkins's Q(lambda)
+#   for the q_lrn policy or SARSA(lambda) for sarsa so that the reward of each
+#   step is backed up along the whole recent trajectory rather than one step.
+#   Traces are held densely as an array the shape of the flat q-table, updated
+#   with whole-array operations each step, or with sparse set as the flat
+#   indices and values of the traces above cutoff, which is cheaper for large
+#   tables where few pairs are visited within the life of a trace
+class LamKew(SinKew):
+    def __init__(self, init, pol, env, cOS, cAS, dis, maxS, nTst, gDec, ver,
+            rTst, rTrn, npEnv=False, seed=None, lam=0.9, sparse=False,
+            cutoff=1e-4):
+        super().__init__(init, pol, env, cOS, cAS, dis, maxS, nTst, gDec, ver,
+                rTst, rTrn, npEnv, seed)
+        if self.polE or self.polN:
+            raise ValueError('Eligibility traces are available for the q_lrn'
+                    ' and sarsa policies only')
+
+        # Set trace decay and representation
+        self.lam = lam
+        self.sparse = sparse
+        self.cutoff = cutoff
+
+        # Dense traces, or flat indices and values of sparse traces
+        self.E = None
+        self.Ei = np.zeros(64, dtype=np.int64)
+        self.Ev = np.zeros(64)
+        self.En = 0
+
+    # Initialize environment, Q-table and traces
+    def init_env(self, resolution):
+        super().init_env(resolution)
+
+        if not self.sparse and (self.E is None or self.E.size != self.Qf.size):
+            self.E = np.zeros(self.Qf.size)
+
+        return
+
+    # Batched training has no traces
+    def init_batch(self, resolution, runs):
+        raise ValueError('Batched training is not available with eligibility'
+                ' traces')
+
+    # e-Greedy action selection from the current row of the table, as every
+    #   value with a trace changes on each step
+    def e_greedy(self, epsilon, s, greedy=False):
+
+        if greedy or self.rng.uniform() > epsilon: d_a = int(np.argmax(
+            self.Qf[s]))
+        else: d_a = self.rng.action()
+
+        if self.cont_as: a = self.get_continuous_action(d_a)
+        else: a = d_a
+
+        return a, d_a
+
+    # Set every trace to zero
+    def clear_traces(self):
+        if self.sparse: self.En = 0
+        else: self.E.fill(0)
+
+    # Increment the trace of flat state-action index i, add step times the
+    #   traces to the q-values and decay the traces by decay, clearing them if
+    #   decay is 0
+    def update_traces(self, i, step, decay):
+        Qv = self.Qf.reshape(-1)
+
+        if not self.sparse:
+            self.E[i] += 1
+            Qv += step * self.E
+            if decay: self.E *= decay
+            else: self.E.fill(0)
+            return
+
+        # Find the trace of i, appending it if not present and growing the
+        #   arrays when full
+        k = self.En
+        pos = np.flatnonzero(self.Ei[:k] == i)
+        if len(pos): self.Ev[pos[0]] += 1
+        else:
+            if k == len(self.Ei):
+                self.Ei = np.concatenate((self.Ei, np.zeros_like(self.Ei)))
+                self.Ev = np.concatenate((self.Ev, np.zeros_like(self.Ev)))
+            self.Ei[k] = i
+            self.Ev[k] = 1
+            k += 1
+
+        Ei, Ev = self.Ei[:k], self.Ev[:k]
+        Qv[Ei] += step * Ev
+
+        # Decay the traces and drop those below cutoff
+        if not decay:
+            self.En = 0
+            return
+        Ev *= decay
+        keep = Ev >= self.cutoff
+        self.En = np.count_nonzero(keep)
+        if self.En < k:
+            self.Ei[:self.En] = Ei[keep]
+            self.Ev[:self.En] = Ev[keep]
+
+    # Perform training on the Q table for the given environment, called once per
+    #   episode taking variables to control the training process
+    def lrn(self, epsilon, episode, penalty, exponent, length, alpha, gamma):
+
+        # Set vars used for checks in training
+        steps = 0
+        maxS = False
+        done = False
+        render = False
+
+        # Create value for recording total reward per epidode
+        total_reward = 0
+
+        # Reset environment for new episode and get initial discretized state
+        if self.cont_os: d_s = self.get_discrete_state(self.env.reset())
+        else:
+            s = self.env.reset()
+            d_s = s
+        self.clear_traces()
+
+        # Report episode and epsilon and set the episode to be rendered
+        #   if the resolution is reached
+        if episode % self.resolution == 0 and episode != 0:
+            if self.verboseFlag: print(episode, epsilon)
+            if self.renderTrain: render = True
+
+        # Get initial action using e-Greedy method, the next action is chosen
+        #   before each update for both policies
+        a, d_a = self.e_greedy(epsilon, d_s)
+
+        # Loop the task until task is completed or max steps are reached
+        while not done:
+            steps += 1
+            if render: self.env.render()
+
+            # Get next state from the chosen action and record reward
+            s_, reward, done, info = self.env.step(a)
+            total_reward += reward
+
+            # Discretise state if observation space is continuous
+            if self.cont_os: d_s_ = self.get_discrete_state(s_)
+            else: d_s_ = s_
+
+            # If gamma decay flag, calculate gamma value and iterate counter
+            if self.gDecayFlag:
+                gamma = 1 - math.exp(exponent * self.N[d_s, d_a])
+                self.N[d_s, d_a] += 1
+
+            # If max steps have been exceeded set episode to complete
+            if maxS: done = True
+
+            # If the task is not completed get the TD error by selected policy
+            #   and decay the traces, cutting them for Q-Lrn if the next
+            #   action is exploratory
+            decay = 0
+            if not done:
+                a_, d_a_ = self.e_greedy(epsilon, d_s_)
+                best = np.max(self.Qf[d_s_])
+
+                if self.polQ: future = best
+                else: future = self.Qf[d_s_, d_a_]
+
+                if self.polS or self.Qf[d_s_, d_a_] == best:
+                    decay = gamma * self.lam
+
+                delta = reward + gamma * future - self.Qf[d_s, d_a]
+                self.update_traces(d_s * self.action_n + d_a, alpha * delta,
+                        decay)
+
+            # If task is completed with max steps not reached update with the
+            #   penalty as next SA value
+            elif not maxS:
+                delta = reward + gamma * penalty - self.Qf[d_s, d_a]
+                self.update_traces(d_s * self.action_n + d_a, alpha * delta,
+                        decay)
+
+            if done:
+                # Record total reward in the rolling window
+                self.window.record(total_reward)
+
+                # Print resolution results if verbose flag is set
+                if self.verboseFlag and episode % self.resolution == 0\
+                        and episode != 0:
+                    print(*self.window.stats()[:3])
+
+                # Close the render of the episode if rendered
+                if render: self.env.close()
+
+            # Set next state and action to current state and action
+            else: d_s, d_a, a = d_s_, d_a_, a_
+
+            # If max steps are reached complete episode and set max step flag
+            if steps == self.maxSteps: maxS = True
+
+        # Rebuild the greedy cache of the table for testing
+        self.greedy = GreedyCache(self.Qf)
+
+        return
@@ -1,4 +1,5 @@
-import matplotlib.pyplot as plt
+import os
+import multiprocessing as mp
 
 font = {'family': 'serif',
         'color':  'black',
@@ -6,9 +7,47 @@ font = {'family': 'serif',
         'size': 11,
         }
 
+# Directory and formats that figures are saved to in place of being shown,
+#   set by headless
+output = None
+formats = ('png', )
+
+# Import pyplot when first plotting rather than with this module, using the
+#   non-interactive Agg backend if figures are saved to files
+def pyplot():
+    import matplotlib
+    if output is not None: matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    return plt
+
+# Save every figure to files of the given formats (e.g. png, svg) in a
+#   directory instead of showing it, so that plotting never blocks
+def headless(directory, fmts=('png', )):
+    global output, formats
+
+    os.makedirs(directory, exist_ok=True)
+    output = directory
+    formats = tuple(fmts)
+
+# Check if figures are shown and so scripts should wait for the user
+def interactive():
+    return output is None
+
+# Show the current figure, or save it under name and close it if headless
+def show(plt, name):
+    if output is None:
+        plt.show()
+        return
+
+    for fmt in formats: plt.savefig(os.path.join(output, f'{name}.{fmt}'))
+    plt.close('all')
+
 # Plotting function to plot timestep rewards to show how the average agent
 #   reward increases over the training period by the specified resolution
-def plot(rewards, mins, maxs, uq, lq):
+def plot(rewards, mins, maxs, uq, lq, name='curves'):
+    plt = pyplot()
+
     #plt.ylim(0, 500)
     plt.xlabel('Episode', fontdict=font)
     plt.ylabel('Reward', fontdict=font)
@@ -20,18 +59,22 @@ def plot(rewards, mins, maxs, uq, lq):
 
     plt.legend()
 
-    plt.show()
+    show(plt, name)
 
 # Plot average reward against standard deviation of reward
-def plotStd(rwd, std):
+def plotStd(rwd, std, name='std'):
+    plt = pyplot()
+
     plt.plot(rwd, std, ',b')
     plt.xlabel('Reward', fontdict=font)
     plt.ylabel('Standard Deviation', fontdict=font)
 
-    plt.show()
+    show(plt, name)
 
 # Plot notched box plot for rewards of each experiment along with average
-def boxPlot(data, avg, ind):
+def boxPlot(data, avg, ind, name='box'):
+    plt = pyplot()
+
     fig1, ax1 = plt.subplots()
     plt.xlabel('Experiment Index', fontdict=font)
     plt.ylabel('Reward', fontdict=font)
@@ -40,26 +83,48 @@ def boxPlot(data, avg, ind):
 
     plt.legend()
 
-    plt.show()
+    show(plt, name)
 
 # Plot grid of histograms of frequency of average rewards for each experiment
-def histExp(data, row, col, experiments):
+def histExp(data, row, col, experiments, name='hist'):
+    plt = pyplot()
 
-    fig, ax = plt.subplots(row, col)
+    fig, ax = plt.subplots(row, col, squeeze=False)
     e = 0
 
     for x in range(row):
         for y in range(col):
+            if e == experiments: break
             ax[x, y].hist(data[e], 100)
             e += 1
 
-    plt.show()
+    show(plt, name)
 
 # Plot histogram of reward frequency
-def hist(data):
+def hist(data, name='hist'):
+    plt = pyplot()
 
     plt.hist(data, 100)
 
-    plt.show()
+    show(plt, name)
+
+# Draw one figure in a worker process, saving it to files
+def work(task):
+    directory, fmts, function, args, name = task
+
+    headless(directory, fmts)
+    globals()[function](*args, name=name)
+
+    return name
 
+# Draw many figures in parallel worker processes and save them to files in a
+#   directory. Each figure is a tuple (function name, args, file name) of one of
+#   the plotting functions of this module, e.g. ('plot', curves, 'exp1')
+def render(figures, directory, fmts=('png', ), workers=None):
+    os.makedirs(directory, exist_ok=True)
+    tasks = [(directory, tuple(fmts), f, args, name)
+            for f, args, name in figures]
+    if not tasks: return
 
+    with mp.Pool(min(workers or mp.cpu_count(), len(tasks))) as pool:
+        for name in pool.imap_unordered(work, tasks): pass
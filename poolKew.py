@@ -0,0 +1,115 @@
+import math
+import numpy as np
+import multiprocessing as mp
+from timeit import default_timer as timer
+
+import cacheKew
+from shmKew import ResultStore
+from ckptKew import Checkpoint
+
+# Run one chunk of runs of an experiment in a worker process and write its
+#   aggregate arrays into the shared result store. The learner is reseeded for
+#   each chunk so workers do not repeat the random streams of the learner they
+#   receive from the parent. The rows are written to row i of the store with
+#   the seconds taken, and the chunk is saved to the checkpoint if given
+def work(task):
+    e, i, start, stop, seed, q, ctrl, args, store, ckpt = task
+
+    q.set_seed(seed)
+
+    start_split = timer()
+    aggr = ctrl(q, stop - start, *args)
+    store.write(i, start, aggr, timer() - start_split)
+    store.close()
+
+    if ckpt is not None: ckpt.save(e, start, aggr, q)
+
+    return e, start
+
+# Key of the learners, control functions and arguments of the experiments and
+#   the seed of a sweep, which along with its shape determine its results.
+#   Learners are described by their class and the plain values set on them,
+#   such as the policy, environment and discretisation
+def fingerprint(experiments, seed):
+    jobs = []
+    for q, ctrl, args in experiments:
+        settings = {k: v for k, v in vars(q).items()
+                if isinstance(v, (bool, int, float, str, type(None)))}
+        jobs.append((type(q).__name__, settings,
+            f'{ctrl.__module__}.{ctrl.__qualname__}', args))
+
+    # Describe seed sequences by the entropy and spawn key they are built from
+    if isinstance(seed, (list, tuple)):
+        seed = [(s.entropy, s.spawn_key) if isinstance(s,
+            np.random.SeedSequence) else s for s in seed]
+
+    return cacheKew.key({'jobs': jobs, 'seed': seed})
+
+# Split the runs of every experiment into chunks and execute them across a pool
+#   of worker processes. Each experiment is a tuple (q, ctrl, args) where the
+#   control function is called as ctrl(q, runs, *args) and returns the tuple of
+#   aggregate arrays of do.do or doBin.do (one row per run, with dataPoints
+#   values in each learning curve). Workers write their rows into a shared
+#   ResultStore, or a ColumnStore on disk, at the rows in index (by default in
+#   experiment order); if a store is given the returned arrays are views of
+#   it, otherwise a temporary store is used and copied. The seed is either the
+#   seed of the sweep or a list of seeds of each experiment. A list of the
+#   aggregate arrays of every experiment is returned in experiment order. If a
+#   checkpoint directory is given each completed chunk is saved to it, and
+#   chunks found there from an earlier call of the same experiments, seed and
+#   shape are loaded instead of run, with the Q-tables and generator state of
+#   each chunk saved if tables is set
+def sweep(experiments, runs, dataPoints, workers=None, chunk=None, seed=None,
+        store=None, checkpoint=None, tables=False, index=None):
+
+    # Use every core by default and split the runs so that each worker gets
+    #   several chunks to balance experiments of different lengths
+    if workers is None: workers = mp.cpu_count()
+    if chunk is None:
+        chunk = max(1, math.ceil(runs * len(experiments) / (workers * 4)))
+    chunk = min(chunk, runs)
+
+    # Create the shared result store if one is not supplied
+    temp = store is None
+    if temp: store = ResultStore(len(experiments), runs, dataPoints)
+    if index is None: index = range(len(experiments))
+
+    # Close and unlink a temporary store even if a worker raises, so a failed
+    #   sweep does not leak its shared memory
+    try:
+        # Create an independent seed for each chunk from the seed of its
+        #   experiment, spawned from the sweep seed if not given
+        if isinstance(seed, (list, tuple)):
+            seeds = [s if isinstance(s, np.random.SeedSequence) else
+                    np.random.SeedSequence(s) for s in seed]
+        else: seeds = np.random.SeedSequence(seed).spawn(len(experiments))
+        starts = range(0, runs, chunk)
+
+        # Open the checkpoint of the sweep if one is given, refusing one of
+        #   other experiments or seed
+        ckpt = None
+        if checkpoint is not None:
+            ckpt = Checkpoint(checkpoint, len(experiments), runs, dataPoints,
+                    chunk, tables, fingerprint(experiments, seed))
+
+        # Load chunks completed by an earlier sweep and create tasks for the
+        #   rest
+        tasks = []
+        for e, (q, ctrl, args) in enumerate(experiments):
+            for start, s in zip(starts, seeds[e].spawn(len(starts))):
+                if ckpt is not None and ckpt.done(e, start):
+                    store.write(index[e], start, ckpt.load(e, start))
+                else: tasks.append((e, index[e], start,
+                    min(start + chunk, runs), s, q, ctrl, args, store, ckpt))
+
+        # Wait for every chunk to be written into the store
+        if tasks:
+            with mp.Pool(min(workers, len(tasks))) as pool:
+                for e, start in pool.imap_unordered(work, tasks): pass
+
+        if not temp: return [store.result(i) for i in index]
+
+        return [tuple(a.copy() for a in store.result(e))
+                for e in range(len(experiments))]
+    finally:
+        if temp: store.close()
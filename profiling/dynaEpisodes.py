@@ -0,0 +1,51 @@
+import sys
+import numpy as np
+from timeit import default_timer as timer
+
+from sinKew import SinKew
+from dynaKew import DynaKew
+
+# Comparison of the average training reward of the episodes leading up to
+#   each number of episodes by one-step Q-learning and Dyna-Q with planning
+#   updates between real steps, on the discrete Taxi environment of gym where
+#   the model of each state-action pair is exact. Run from the top level
+#   directory with PYTHONPATH set to it: python profiling/dynaEpisodes.py [runs]
+
+runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+checkpoints = [50, 100, 200, 300]
+
+maxSteps = 200
+alpha = 0.5
+gamma = 0.95
+epsilon = 0.1
+resolution = 25
+
+# Train a learner for the largest checkpoint, averaging the rewards of the
+#   last resolution episodes at each checkpoint
+def measure(make):
+    scores = np.zeros((runs, len(checkpoints)))
+    start = timer()
+    for run in range(runs):
+        q = make(run)
+        q.init_env(resolution)
+
+        c = 0
+        for episode in range(checkpoints[-1]):
+            q.lrn(epsilon, episode, 0, -0.75, 5, alpha, gamma)
+            if episode + 1 == checkpoints[c]:
+                scores[run, c] = q.window.stats()[0]
+                c += 1
+
+    return np.average(scores, axis=0), timer() - start
+
+args = ('zeros', 'q_lrn', 'Taxi-v3', False, False, 0, maxSteps, 1, False,
+        False, False, False, False)
+learners = [('one-step', lambda r: SinKew(*args, seed=r))]
+for k in (10, 50):
+    learners.append((f'dyna {k}',
+        lambda r, k=k: DynaKew(*args, seed=r, planning=k)))
+
+for label, make in learners:
+    scores, seconds = measure(make)
+    print(f'{label}: {np.round(scores, 1)} at {checkpoints} episodes, '
+            f'{seconds:.1f} s')
@@ -0,0 +1,40 @@
+import os
+import sys
+import subprocess
+
+# Benchmark of the time to import the learner and control modules in a fresh
+#   interpreter, as paid by every spawned worker process, compared with also
+#   importing gym and matplotlib as the modules did before their imports were
+#   deferred until an environment is created or a figure is drawn. Run from the
+#   top level directory: python profiling/importTime.py [repeats]
+
+# Modules imported by a worker of a sweep
+modules = ['sinKew', 'dblKew', 'do', 'doBin', 'poolKew']
+# Modules which used to be imported with them
+eager = ['gym', 'matplotlib.pyplot']
+
+repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+# Run the imports in a new interpreter, returning the seconds taken and the
+#   eager modules that were loaded
+def measure(names):
+    code = 'import sys, time\n' +\
+            't = time.perf_counter()\n' +\
+            ''.join(f'import {n}\n' for n in names) +\
+            'print(time.perf_counter() - t)\n' +\
+            f'print([m for m in {eager} if m in sys.modules])\n'
+
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    out = subprocess.run([sys.executable, '-W', 'ignore', '-c', code],
+            capture_output=True, text=True, env=env, check=True).stdout
+    seconds, loaded = out.splitlines()
+
+    return float(seconds), loaded
+
+# Report the fastest of the repeats of each set of imports
+for label, names in (('lazy', modules), ('eager', modules + eager)):
+    times = []
+    for r in range(repeats):
+        seconds, loaded = measure(names)
+        times.append(seconds)
+    print(f'{label}: {min(times) * 1000:.1f} ms, loaded {loaded}')
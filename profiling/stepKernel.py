@@ -0,0 +1,34 @@
+import sys
+import time
+
+from sinKew import SinKew
+from dblKew import DblKew
+
+# Benchmark of the seconds per training episode of the learners with the step
+#   kernel of lrn, working on Python numbers, against the original step body
+#   working on numpy scalars. Both train on identical random streams and so
+#   take the same steps. Run from the top level directory with PYTHONPATH set
+#   to it: python profiling/stepKernel.py [episodes]
+
+episodes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+# Train a learner for the episodes, returning the seconds per episode taken
+def measure(C, pol, env, dis, kernel):
+    q = C('uniform', pol, env, True, False, dis, 500, 5, False, False, False,
+            False, True, seed=1)
+    q.kernel = kernel
+    q.init_env(episodes)
+
+    t = time.perf_counter()
+    for episode in range(episodes):
+        q.lrn(0.1, episode, -1, -0.75, 5, 0.5, 0.995)
+
+    return (time.perf_counter() - t) / episodes
+
+for C in (SinKew, DblKew):
+    for pol in ('q_lrn', 'sarsa'):
+        for env, dis in (('CartPole-v1', 6), ('MountainCar-v0', 8)):
+            base = measure(C, pol, env, dis, False)
+            kern = measure(C, pol, env, dis, True)
+            print(f'{C.__name__} {pol} {env}: {base * 1e3:.2f} ms -> '
+                    f'{kern * 1e3:.2f} ms per episode ({base / kern:.2f}x)')
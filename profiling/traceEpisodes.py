@@ -0,0 +1,61 @@
+import sys
+import numpy as np
+from timeit import default_timer as timer
+
+from sinKew import SinKew
+from lamKew import LamKew
+from dynaKew import DynaKew
+
+# Comparison of the test reward reached after each number of training episodes
+#   by one-step learners, n-step learners, learners with eligibility traces and
+#   learners with Dyna-Q planning (for q_lrn) on MountainCar with the NumPy
+#   simulator, averaged over a few seeded runs.
+#   Exploration comes from the optimistic zero initialisation of the table.
+#   Run from the top level directory with PYTHONPATH set to it:
+#   python profiling/traceEpisodes.py [runs]
+
+runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+checkpoints = [100, 200, 300, 400]
+
+discretisation = 14
+maxSteps = 200
+alpha = 0.1
+gamma = 0.995
+epsilon = 0
+
+# Train a learner for the largest checkpoint, testing at each checkpoint
+def measure(make):
+    scores = np.zeros((runs, len(checkpoints)))
+    start = timer()
+    for run in range(runs):
+        q = make(run)
+        q.init_env(10)
+
+        c = 0
+        for episode in range(checkpoints[-1]):
+            q.lrn(epsilon, episode, 0, -0.75, 5, alpha, gamma)
+            if episode + 1 == checkpoints[c]:
+                scores[run, c] = q.test_qtable()[0]
+                c += 1
+
+    return np.average(scores, axis=0), timer() - start
+
+for pol in ('q_lrn', 'sarsa'):
+    args = ('zeros', pol, 'MountainCar-v0', True, False, discretisation,
+            maxSteps, 20, False, False, False, False, True)
+    learners = [('one-step', lambda r: SinKew(*args, seed=r))]
+    nargs = args[:1] + ('nstep_' + pol, ) + args[2:]
+    learners.append(('4-step', lambda r: SinKew(*nargs, seed=r, nStep=4)))
+    learners.append(('16-step', lambda r: SinKew(*nargs, seed=r, nStep=16)))
+    learners.append(('lambda 0.9', lambda r: LamKew(*args, seed=r, lam=0.9)))
+    learners.append(('lambda 0.9 sparse',
+        lambda r: LamKew(*args, seed=r, lam=0.9, sparse=True)))
+    if pol == 'q_lrn':
+        for k in (10, 50):
+            learners.append((f'dyna {k}',
+                lambda r, k=k: DynaKew(*args, seed=r, planning=k)))
+
+    for label, make in learners:
+        scores, seconds = measure(make)
+        print(f'{pol} {label}: {np.round(scores, 1)} at {checkpoints} '
+                f'episodes, {seconds:.1f} s')
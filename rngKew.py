@@ -0,0 +1,40 @@
+import numpy as np
+
+# Random number source of a learner wrapping its own numpy Generator. Uniforms
+#   and random actions used one at a time in the training loop are generated in
+#   blocks ahead of time and served from buffers of Python numbers, avoiding a
+#   call into the global numpy random state on every step
+class KewRng:
+    def __init__(self, seed, action_n, block=1024):
+        self.gen = np.random.default_rng(seed)
+        self.action_n = action_n
+        self.block = block
+
+        # Buffers start empty and are filled on first use
+        self.u, self.ui = [], block
+        self.a, self.ai = [], block
+
+    # Next uniform value in [0, 1)
+    def uniform(self):
+        if self.ui == self.block:
+            self.u = self.gen.random(self.block).tolist()
+            self.ui = 0
+        self.ui += 1
+
+        return self.u[self.ui - 1]
+
+    # Next random action in [0, action_n)
+    def action(self):
+        if self.ai == self.block:
+            self.a = self.gen.integers(0, self.action_n, self.block).tolist()
+            self.ai = 0
+        self.ai += 1
+
+        return self.a[self.ai - 1]
+
+    # Arrays of n uniforms and of n random actions for batched lanes
+    def uniforms(self, n):
+        return self.gen.random(n)
+
+    def actions(self, n):
+        return self.gen.integers(0, self.action_n, n)
@@ -0,0 +1,41 @@
+import math
+
+# Epsilon, alpha and gamma of every episode of a run, as lists of floats
+#   indexed by episode that are shared by every run of an experiment. Epsilon
+#   is constant, decays linearly by eDecayRate from epsilonDecay between
+#   eDecayStart and eDecayEnd, or decays exponentially with eDecayExp. Alpha
+#   and gamma decay exponentially by episode if their flags are set
+def schedule(episodes, eDecayFlag, gamma, alpha, epsilon, epsilonDecay,
+        eDecayStart, eDecayEnd, eDecayRate, eDecayExp, aDecayFlag, gDecayFlag):
+
+    # Calculate decay esponent -TODO:change division to variable
+    exp = 1 / (episodes / 5)
+
+    # Reset decaying epsilon to starting value
+    if eDecayFlag and not eDecayExp: epsilon = epsilonDecay
+
+    epsilons = [epsilon] * episodes
+    alphas = [alpha] * episodes
+    gammas = [gamma] * episodes
+
+    for episode in range(episodes):
+        # Check for epsilon decay flag
+        if eDecayFlag:
+            # Check for linear epsilon decay
+            if not eDecayExp:
+                # Decay epsilon values during epsilon decay range
+                if eDecayEnd >= episode >= eDecayStart:
+                    epsilon -= eDecayRate
+                    # Prevent epsilon from going negative
+                    if epsilon < 0:
+                        epsilon = 0
+            # Check for exponential epsilon decay and calculate from episode
+            elif eDecayExp: epsilon = 0.5 * math.exp(-exp * episode)
+            epsilons[episode] = epsilon
+
+        # Check alpha decay flag and set alpha according episode
+        if aDecayFlag: alphas[episode] = math.exp(-exp * episode)
+        # Also for gamma -TODO:replace hardcoded intersect values
+        if gDecayFlag: gammas[episode] = 1 + -math.exp(-exp * episode)
+
+    return epsilons, alphas, gammas
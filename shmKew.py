@@ -0,0 +1,74 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+# Result store for parallel sweeps backed by one block of shared memory that
+#   holds the aggregate arrays returned by do.do and doBin.do for every run of
+#   every experiment. Worker processes attach to the block by name when the
+#   store is unpickled and write the rows of their runs in place, so results
+#   are not serialised back to the parent
+class ResultStore:
+    # Names of the aggregate arrays in the order returned by do.do
+    names = ('rewards', 'stds', 'ts_r', 'ts_r_min', 'ts_r_max', 'ts_r_uq',
+            'ts_r_lq')
+
+    def __init__(self, experiments, runs, dataPoints, name=None):
+        self.experiments = experiments
+        self.runs = runs
+        self.dataPoints = int(dataPoints)
+
+        # Create the shared block, or attach to an existing one if named
+        size = experiments * runs * (2 + 5 * self.dataPoints) * 8
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.views()
+            for a in self.arrays: a[:] = 0
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.views()
+
+    # Create the arrays as consecutive views of the shared block
+    def views(self):
+        shapes = [(self.experiments, self.runs)] * 2 +\
+                [(self.experiments, self.runs, self.dataPoints)] * 5
+        self.arrays = []
+        offset = 0
+        for shape in shapes:
+            a = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf,
+                    offset=offset)
+            self.arrays.append(a)
+            offset += a.nbytes
+
+        for n, a in zip(self.names, self.arrays): setattr(self, n, a)
+
+    # Pickle the store as the name and shape of the block to attach to it
+    def __getstate__(self):
+        return (self.experiments, self.runs, self.dataPoints, self.shm.name)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    # Write aggregate arrays for the runs start onwards of an experiment, the
+    #   seconds taken are not kept in shared memory
+    def write(self, e, start, aggr, seconds=None):
+        for res, a in zip(self.arrays, aggr):
+            res[e, start:start + len(a)] = a
+
+    # Aggregate arrays of an experiment in the order returned by do.do
+    def result(self, e):
+        return tuple(a[e] for a in self.arrays)
+
+    # Release the views and the block, which is removed by its owner. Arrays
+    #   taken from result must be deleted before the store is closed
+    def close(self):
+        self.arrays = []
+        for n in self.names:
+            if hasattr(self, n): delattr(self, n)
+        self.shm.close()
+        if self.owner: self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,14 +1,26 @@
-import gym
 import math
 import numpy as np
 
+import kewEnv
+from disKew import Discretiser
+from greedyKew import GreedyCache, row_max
+from rngKew import KewRng
+from statKew import RewardWindow
+from trailKew import PenaltyTrail
+
 # Q-learning class to train and test q table for given environment
 class SinKew:
     def __init__(self, init, pol, env, cOS, cAS, dis, maxS, nTst, gDec, ver,
-            rTst, rTrn):
+            rTst, rTrn, npEnv=False, seed=None, log=False, nStep=4):
         
-        # Set poliy bools for control of Q-learning
-        if pol == 'q_lrn':
+        # Set poliy bools for control of Q-learning, with the n-step flag for
+        #   the n-step returns of any policy. Expected SARSA chooses actions
+        #   as Q-Lrn and takes the expected value of the next state under the
+        #   e-greedy policy in place of its maximum
+        self.polN = pol.startswith('nstep_')
+        if self.polN: pol = pol[len('nstep_'):]
+        self.polE = pol == 'expected_sarsa'
+        if pol == 'q_lrn' or self.polE:
             self.polQ = True
             self.polS = False
         elif pol == 'sarsa':
@@ -28,19 +40,127 @@ class SinKew:
         self.verboseFlag = ver
         self.renderTest = rTst
         self.renderTrain = rTrn
+        self.npEnv = npEnv
+        self.logFlag = log
+
+        # Use the step kernel of lrn where it applies
+        self.kernel = True
+
+        # Circular buffer of the flat state-action indices and rewards of the
+        #   last n steps for n-step policies, and the powers of gamma of each
+        #   position of the oldest step in it, calculated for each new gamma
+        if self.polN and gDec:
+            raise ValueError('Gamma decay by encounters is not available with'
+                    ' n-step policies')
+        self.nStep = nStep
+        self.nIndex = np.zeros(nStep, dtype=np.int64)
+        self.nReward = np.zeros(nStep)
+        self.nGamma = None
+
+        # Ring buffer of the most recent state-action pairs of an episode for
+        #   the exponential penalty applied when the log flag is set
+        self.trail = PenaltyTrail()
+
+        # Environments of the learner by number of lanes and step limit,
+        #   created when first needed and reused by every following run and bin
+        self.envs = {}
+
+        # Q-tables and counters, refilled in place by each run once created
+        self.Q = None
+        self.N = None
+
+        # Set seed from which the random streams of each run are spawned
+        self.set_seed(seed)
+
+    # Set the seed (an int or a SeedSequence) of the learner, each call to
+    #   init_env or init_batch spawns independent and reproducible random
+    #   streams from it
+    def set_seed(self, seed):
+        if isinstance(seed, np.random.SeedSequence): self.seed_seq = seed
+        else: self.seed_seq = np.random.SeedSequence(seed)
+
+    # Get the environment with n lanes (a single environment if n is None),
+    #   created on first use and reseeded with the given seed on every call.
+    #   If maxSteps is given the lanes reset on their own when they complete
+    #   the task or after maxSteps steps
+    def get_env(self, seed, n=None, maxSteps=None):
+        key = (n, maxSteps)
+        if key not in self.envs:
+            # Use the built-in NumPy simulator if set, importing gym only when
+            #   one of its environments is needed
+            if n is not None or self.npEnv:
+                self.envs[key] = kewEnv.make(self.environment, n,
+                        autoReset=maxSteps is not None, maxSteps=maxSteps)
+            else:
+                import gym
+                self.envs[key] = gym.make(self.environment).env
+        env = self.envs[key]
+
+        # Seed gym environments with an int drawn from the seed
+        if n is None and not self.npEnv:
+            env.seed(int(seed.generate_state(1)[0]))
+        else: env.seed(seed)
+
+        return env
 
     # Initialize environment and Q-table
     def init_env(self, resolution):
 
-        # Create numpy array to store rewards for use in statistical tracking
-        self.timestep_reward_res = np.zeros(resolution)
+        # Create rolling window of episode rewards for statistical tracking
+        self.window = RewardWindow(resolution)
         self.resolution = resolution
-        self.res = 0
 
-        # Initialize environment
-        self.env = gym.make(self.environment).env
+        # Spawn the seeds of the environments and learner for this run
+        env_seed, rng_seed, self.test_seed = self.seed_seq.spawn(3)
+
+        # Reseed the environment, created on the first run only
+        self.env = self.get_env(env_seed)
         self.env.reset()
         
+        # Calculate the discrete observation and action spaces and create the
+        #   random streams of the run
+        self.init_spaces()
+        self.rng = KewRng(rng_seed, self.action_n)
+        
+        # Initialise q-table with supplied type, stored as a contiguous
+        #   (n_states, action_n) table indexed by flat state index with Q as a
+        #   view of it in the shape of the observation and action spaces
+        self.Q = self.init_table(self.discrete_os_size + self.discrete_as_size,
+                self.Q)
+        self.Qf = self.Q.reshape(self.n_states, -1)
+
+        # Cache the greedy action and maximum value of every state, updated
+        #   with each change to the table during training
+        self.greedy = GreedyCache(self.Qf)
+        
+        # Create counter array for calculating decayed gamma values
+        if self.gDecayFlag:
+            if self.N is None or self.N.shape != self.Qf.shape:
+                self.N = np.empty(self.Qf.shape)
+            self.N.fill(1)
+
+        return
+
+    # Create a q-table of the given size with the supplied initialisation type,
+    #   filling the table Q in place instead if it is already of that size
+    def init_table(self, size, Q=None):
+        if Q is None or Q.shape != tuple(size): Q = np.empty(size)
+
+        # Uniform values in [-2, 0) drawn as with Generator.uniform
+        if self.initialisation == 'uniform':
+            self.rng.gen.random(out=Q.reshape(-1))
+            Q *= 2
+            Q += -2
+        elif self.initialisation == 'zeros': Q.fill(0)
+        elif self.initialisation == 'ones': Q.fill(1)
+        else: print('initialisation method not valid')
+
+        return Q
+
+    # Calculate the sizes of the discrete observation and action spaces of the
+    #   environment
+    def init_spaces(self):
+
         # If observation space is continuous do calculations to create
         #   corresponding bins for use with Q table
         if self.cont_os:
@@ -56,8 +176,15 @@ class SinKew:
             self.discrete_os_size = [self.dis] * len(self.os_high)
             self.discrete_os_win_size = (self.os_high\
                     - self.os_low) / self.discrete_os_size
+
+            # Create the discretiser used to map observations to bins
+            self.disc = Discretiser(self.os_low, self.os_high,
+                    self.discrete_os_size)
         # Use number of observations if no discretization is required
         else: self.discrete_os_size = [self.env.observation_space.n]
+
+        # Number of discrete states, the rows of the flat q-table
+        self.n_states = int(np.prod(self.discrete_os_size))
         
         # The same for action space
         if self.cont_as:
@@ -73,32 +200,14 @@ class SinKew:
         else:
             self.discrete_as_size = [self.env.action_space.n]
             self.action_n = self.env.action_space.n
-        
-        # Initialise q-table with supplied type
-        if self.initialisation == 'uniform':
-            self.Q = np.random.uniform(low = -2, high = 0, size=(
-                self.discrete_os_size + self.discrete_as_size))
-        elif self.initialisation == 'zeros':
-            self.Q = np.zeros((self.discrete_os_size +
-                self.discrete_as_size))
-        elif self.initialisation == 'ones':
-            self.Q = np.ones((self.discrete_os_size +
-                self.discrete_as_size))
-        else: print('initialisation method not valid')
-        
-        # Create counter array for calculating decayed gamma values
-        if self.gDecayFlag:
-            self.N = np.ones((self.discrete_os_size + self.discrete_as_size))
 
         return
 
-    # Get the discrete state from the state supplied by the environment
+    # Get the discrete state from the state supplied by the environment as the
+    #   flat index of its row in the q-table, clipped to the observation space
     def get_discrete_state(self, state):
         
-        discrete_state = ((state - self.os_low) /\
-                self.discrete_os_win_size)
-        
-        return tuple(discrete_state.astype(np.int))
+        return self.disc.index(state)
 
     # Get the continuous action from the discrete action supplied by e-greedy
     def get_continuous_action(self, discrete_action):
@@ -113,8 +222,8 @@ class SinKew:
     #   epsilon value. Gets the continuous action if needed
     def e_greedy(self, epsilon, s, greedy=False):
         
-        if greedy or np.random.rand() > epsilon: d_a = np.argmax(self.Q[s])
-        else: d_a = np.random.randint(0, self.action_n)
+        if greedy or self.rng.uniform() > epsilon: d_a = self.greedy.G[s]
+        else: d_a = self.rng.action()
 
         if self.cont_as: a = self.get_continuous_action(d_a)
         else: a = d_a
@@ -125,6 +234,15 @@ class SinKew:
     #   episode taking variables to control the training process
     def lrn(self, epsilon, episode, penalty, exponent, length, alpha, gamma):
 
+        # Use n-step returns if set by the policy
+        if self.polN: return self.lrn_nstep(epsilon, episode, penalty, exponent,
+                length, alpha, gamma)
+
+        # Use the step kernel unless training is rendered or actions continuous
+        if self.kernel and not self.renderTrain and not self.cont_as:
+            return self.lrn_kernel(epsilon, episode, penalty, exponent, length,
+                    alpha, gamma)
+
         # Set vars used for checks in training
         steps = 0
         maxS = False
@@ -139,6 +257,7 @@ class SinKew:
         else:
             s = self.env.reset()
             d_s = s
+        if self.logFlag: self.trail.clear(length)
 
         # Report episode and epsilon and set the episode to be rendered
         #   if the resolution is reached
@@ -167,8 +286,8 @@ class SinKew:
 
             # If gamma decay flag, calculate gamma value and iterate counter
             if self.gDecayFlag:
-                gamma = 1 - math.exp(exponent * self.N[d_s + (d_a, )])
-                self.N[d_s + (d_a, )] += 1
+                gamma = 1 - math.exp(exponent * self.N[d_s, d_a])
+                self.N[d_s, d_a] += 1
 
             # If max steps have been exceeded set episode to complete
             if maxS: done = True
@@ -177,12 +296,15 @@ class SinKew:
             if not done:
                 # Select maximum action of next state for QL (off-policy)
                 if self.polQ:
-                    max_future_q = np.max(self.Q[d_s_])
+                    max_future_q = self.greedy.M[d_s_]
+                    if self.polE: max_future_q = self.expected(epsilon, d_s_,
+                            max_future_q)
                 
                     # Update Q-value with Bellman Equation for selected action
-                    self.Q[d_s + (d_a, )] = self.Q[d_s + (d_a,)]\
+                    self.Qf[d_s, d_a] = self.Qf[d_s, d_a]\
                             + alpha * (reward + gamma *\
-                            max_future_q - self.Q[d_s + (d_a,)])
+                            max_future_q - self.Qf[d_s, d_a])
+                    self.greedy.update(d_s, d_a)
 
                 # Select next action based on next state using
                 #   e-Greedy method for SARSA (on-policy)
@@ -190,9 +312,10 @@ class SinKew:
                     a_, d_a_ = self.e_greedy(epsilon, d_s_)
                     
                     # Update Q-value with Bellman Equation for selected action
-                    self.Q[d_s + (d_a, )] = self.Q[d_s + (d_a,)]\
+                    self.Qf[d_s, d_a] = self.Qf[d_s, d_a]\
                             + alpha * (reward + gamma *\
-                            self.Q[d_s_ + (d_a_,)] - self.Q[d_s + (d_a,)])
+                            self.Qf[d_s_, d_a_] - self.Qf[d_s, d_a])
+                    self.greedy.update(d_s, d_a)
             
             # If task is completed set Q-value to zero so no penalty is applied
             if done:
@@ -202,26 +325,29 @@ class SinKew:
                 else:
                     # Update Q-value with Bellman Equation with next SA value
                     #   as 0 when the next state is terminal
-                    self.Q[d_s + (d_a, )] = self.Q[d_s + (d_a,)]\
+                    self.Qf[d_s, d_a] = self.Qf[d_s, d_a]\
                             + alpha * (reward + gamma *\
-                            penalty - self.Q[d_s + (d_a,)])
+                            penalty - self.Qf[d_s, d_a])
+                    self.greedy.update(d_s, d_a)
+
+                    # Apply exponential penalties to the steps leading up to
+                    #   the completion if the log flag is set
+                    if self.logFlag: self.penalise_trail(penalty, exponent)
                
-                # Iterate the resolution counter and record total reward
-                if self.res == self.resolution: self.res = 0
-                else:
-                    self.timestep_reward_res[self.res] = total_reward
-                    self.res += 1    
+                # Record total reward in the rolling window
+                self.window.record(total_reward)
 
                 # Print resolution results if verbose flag is set
                 if self.verboseFlag and episode % self.resolution == 0\
                         and episode != 0:
-                    print(np.average(self.timestep_reward_res),
-                            np.min(self.timestep_reward_res),
-                            np.max(self.timestep_reward_res))
+                    print(*self.window.stats()[:3])
                 
                 # Close the render of the episode if rendered
                 if render: self.env.close()
 
+            # Record the state-action pair for applying exponential penalties
+            if self.logFlag: self.trail.record(d_s * self.action_n + d_a)
+
             # Set next state to current state (Q-Learning) control policy
             if self.polQ: d_s = d_s_
 
@@ -233,8 +359,278 @@ class SinKew:
         
         return
 
+    # Equivalent of lrn for discrete actions without rendering, with the body
+    #   of each step working on Python numbers rather than numpy scalars. The
+    #   table is read and written through a flat memoryview of Qf, observations
+    #   are discretised with Python arithmetic and the greedy cache is updated
+    #   inline, with the maximum of a row unrolled for 2 and 3 actions. Updates
+    #   and random streams are bit-identical to lrn
+    def lrn_kernel(self, epsilon, episode, penalty, exponent, length, alpha,
+            gamma):
+
+        # Bind the table, cache, counters and random streams to locals
+        Q = memoryview(self.Qf).cast('B').cast('d')
+        G, M = self.greedy.G, self.greedy.M
+        if self.gDecayFlag: N = memoryview(self.N).cast('B').cast('d')
+        n = self.action_n
+        uniform, action = self.rng.uniform, self.rng.action
+        env = self.env
+        polQ, polS, polE = self.polQ, self.polS, self.polE
+        e_n, e_g = epsilon / n, 1 - epsilon
+        maxSteps = self.maxSteps
+        log, record = self.logFlag, self.trail.record
+
+        # Get the flat state index of an observation, reading the floats of the
+        #   state kept by a NumPy environment rather than its array copy
+        index = self.disc.index_floats if self.cont_os else int
+        if not self.cont_os: floats = lambda s: s
+        elif self.npEnv: floats = lambda s: env.s
+        else: floats = lambda s: s.tolist()
+
+        # Set vars used for checks in training
+        steps = 0
+        maxS = False
+        done = False
+        total_reward = 0
+
+        d_s = index(floats(env.reset()))
+        if log: self.trail.clear(length)
+
+        # Report episode and epsilon if the resolution is reached
+        if episode % self.resolution == 0 and episode != 0:
+            if self.verboseFlag: print(episode, epsilon)
+
+        # Get initial action using e-Greedy method for SARSA policy
+        if polS:
+            if uniform() > epsilon: d_a = G[d_s]
+            else: d_a = action()
+
+        # Loop the task until task is completed or max steps are reached
+        while not done:
+            steps += 1
+
+            # Get action using e-Greedy method for Q-Lrn policy
+            if polQ:
+                if uniform() > epsilon: d_a = G[d_s]
+                else: d_a = action()
+
+            # Step the environment and discretise the next state
+            s_, reward, done, info = env.step(d_a)
+            total_reward += reward
+            d_s_ = index(floats(s_))
+
+            # Flat index of the state-action pair to update
+            i = d_s * n + d_a
+
+            # If gamma decay flag, calculate gamma value and iterate counter
+            if self.gDecayFlag:
+                gamma = 1 - math.exp(exponent * N[i])
+                N[i] += 1
+
+            # If max steps have been exceeded set episode to complete
+            if maxS: done = True
+
+            # Update Q-value with Bellman Equation by selected policy, or with
+            #   the penalty if the task is completed and max steps were not
+            #   reached
+            if not done:
+                if polQ: future = M[d_s_]
+                else:
+                    if uniform() > epsilon: d_a_ = G[d_s_]
+                    else: d_a_ = action()
+                    future = Q[d_s_ * n + d_a_]
+                if polE:
+                    j = d_s_ * n
+                    future = e_n * sum(Q[j:j + n]) + e_g * future
+                q = Q[i] + alpha * (reward + gamma * future - Q[i])
+            elif not maxS: q = Q[i] + alpha * (reward + gamma * penalty - Q[i])
+
+            # Write the value and update the greedy cache as GreedyCache.update
+            if not done or not maxS:
+                Q[i] = q
+                m = M[d_s]
+                g = G[d_s]
+                if q > m or (q == m and d_a < g):
+                    G[d_s] = d_a
+                    M[d_s] = q
+                elif d_a == g and q < m:
+                    G[d_s], M[d_s] = row_max(Q, d_s * n, n)
+
+            # Apply exponential penalties to the steps leading up to a
+            #   completion, then record the state-action pair, if log is set
+            if log:
+                if done and not maxS: self.penalise_trail(penalty, exponent)
+                record(i)
+
+            # Move to the next state, and action for SARSA
+            d_s = d_s_
+            if polS and not done: d_a = d_a_
+
+            # If max steps are reached complete episode and set max step flag
+            if steps == maxSteps: maxS = True
+
+        # Record total reward in the rolling window
+        self.window.record(total_reward)
+
+        # Print resolution results if verbose flag is set
+        if self.verboseFlag and episode % self.resolution == 0\
+                and episode != 0:
+            print(*self.window.stats()[:3])
+
+        return
+
+    # Perform training on the Q table for one episode by n-step Q-learning or
+    #   n-step SARSA. The state-action pairs and rewards of the last n steps
+    #   are held in a circular buffer and the oldest pair is updated towards
+    #   the discounted sum of the n rewards that followed it, as a dot product
+    #   with the powers of gamma, plus the discounted value of the state (and
+    #   action for SARSA) n steps on. On completion the pending pairs are
+    #   updated with the remaining rewards and the penalty as next SA value
+    def lrn_nstep(self, epsilon, episode, penalty, exponent, length, alpha,
+            gamma):
+
+        # Bind the buffer and calculate the powers of gamma of every position
+        #   for each slot of the oldest step if gamma has changed
+        n = self.nStep
+        I, R = self.nIndex, self.nReward
+        if self.nGamma != gamma:
+            k = np.arange(n)
+            self.nPowers = gamma ** ((k - k[:, None]) % n)
+            self.nGamma = gamma
+        P = self.nPowers
+        gamma_n = gamma ** n
+
+        # Set vars used for checks in training
+        steps = 0
+        maxS = False
+        done = False
+        render = False
+
+        # Create value for recording total reward per epidode
+        total_reward = 0
+        
+        # Reset environment for new episode and get initial discretized state
+        if self.cont_os: d_s = self.get_discrete_state(self.env.reset())
+        else:
+            s = self.env.reset()
+            d_s = s
+        if self.logFlag: self.trail.clear(length)
+
+        # Report episode and epsilon and set the episode to be rendered
+        #   if the resolution is reached
+        if episode % self.resolution == 0 and episode != 0:
+            if self.verboseFlag: print(episode, epsilon)
+            if self.renderTrain: render = True
+        
+        # Get initial action using e-Greedy method for SARSA policy
+        if self.polS: a, d_a = self.e_greedy(epsilon, d_s)
+
+        # Loop the task until task is completed or max steps are reached
+        while not done:
+            steps += 1
+            if render: self.env.render()
+            
+            # Get initial action using e-Greedy method for Q-Lrn policy
+            if self.polQ: a, d_a = self.e_greedy(epsilon, d_s)
+
+            # Get next state from the chosen action and record reward
+            s_, reward, done, info = self.env.step(a)
+            total_reward += reward
+
+            # Discretise state if observation space is continuous
+            if self.cont_os: d_s_ = self.get_discrete_state(s_)
+            else: d_s_ = s_
+
+            # If max steps have been exceeded set episode to complete
+            if maxS: done = True
+
+            # Record the state-action pair and reward in the slot of the step
+            i = d_s * self.action_n + d_a
+            I[(steps - 1) % n] = i
+            R[(steps - 1) % n] = reward
+
+            # If the task is not completed update the pair n steps back, once
+            #   the buffer is full, by the value of the next state for QL or
+            #   next state and action for SARSA
+            if not done:
+                if self.polQ: future = self.greedy.M[d_s_]
+                if self.polE: future = self.expected(epsilon, d_s_, future)
+                if self.polS:
+                    a_, d_a_ = self.e_greedy(epsilon, d_s_)
+                    future = self.Qf[d_s_, d_a_]
+
+                if steps >= n:
+                    h = steps % n
+                    self.update_flat(I[h], R.dot(P[h]) + gamma_n * future,
+                            alpha)
+
+            # If task is completed with max steps not reached update every
+            #   pending pair, oldest first, with the rewards up to completion
+            #   and the penalty
+            elif not maxS:
+                m = min(steps, n)
+                order = (steps - m + np.arange(m)) % n
+                for j in range(m):
+                    self.update_flat(I[order[j]], R[order[j:]].dot(
+                        P[0, :m - j]) + gamma ** (m - j) * penalty, alpha)
+
+                if self.logFlag: self.penalise_trail(penalty, exponent)
+
+            # Record the state-action pair for applying exponential penalties
+            if self.logFlag: self.trail.record(i)
+
+            if done:
+                # Record total reward in the rolling window
+                self.window.record(total_reward)
+
+                # Print resolution results if verbose flag is set
+                if self.verboseFlag and episode % self.resolution == 0\
+                        and episode != 0:
+                    print(*self.window.stats()[:3])
+                
+                # Close the render of the episode if rendered
+                if render: self.env.close()
+
+            # Set next state to current state (Q-Learning) control policy
+            if self.polQ: d_s = d_s_
+
+            # Set next state and action to current state and action (SARSA)
+            if self.polS and not done: d_s, d_a, a = d_s_, d_a_, a_
+            
+            # If max steps are reached complete episode and set max step flag
+            if steps == self.maxSteps: maxS = True
+        
+        return
+
+    # Expected value of state s under the e-greedy policy for Expected SARSA,
+    #   the dot product of its row with the probability of each action taken
+    #   as epsilon / n of the sum of the row plus 1 - epsilon of the greedy
+    #   value m, which the step kernel calculates with the same arithmetic
+    def expected(self, epsilon, s, m):
+        return epsilon / self.action_n * self.Qf[s].sum() + (1 - epsilon) * m
+
+    # Move the q-value of flat state-action index i towards target
+    def update_flat(self, i, target, alpha):
+        s, a = divmod(int(i), self.action_n)
+        self.Qf[s, a] = self.Qf[s, a] + alpha * (target - self.Qf[s, a])
+        self.greedy.update(s, a)
+
+    # Add the exponentially decayed penalty to the q-values of the steps before
+    #   the completion of the task, recorded in the trail, in one scatter-add
+    #   and update the greedy cache of each changed value
+    def penalise_trail(self, penalty, exponent):
+        index, flag, w = self.trail.recent(penalty, exponent)
+        np.add.at(self.Qf.reshape(-1), index, w)
+
+        for i in set(index.tolist()):
+            self.greedy.update(*divmod(i, self.action_n))
+
     # Test function to test the Q-table
     def test_qtable(self):
+
+        # Play every test at once if the environment has a NumPy simulator
+        if self.npEnv and not self.renderTest: return self.test_vec()
+
         # Create array to store total rewards and steps for each test
         rewards = np.zeros(self.nTests)
 
@@ -279,4 +675,263 @@ class SinKew:
 
         return avg_rwd, std_rwd
 
+    # Test the q-table by playing all of the tests at once in a batched NumPy
+    #   environment. The table is frozen during testing so the greedy action
+    #   of every state is calculated once and looked up for each step
+    def test_vec(self):
+
+        # Create array to store total rewards for each test
+        rewards = np.zeros(self.nTests)
+
+        # Get the greedy policy and one environment lane per test
+        policy = self.greedy.policy()
+        env = self.get_env(self.test_seed, self.nTests)
+        s = env.reset()
+
+        # Loop until every test is done or max steps are reached
+        for steps in range(self.maxSteps):
+            s, reward, done, info = env.step(policy[self.disc.index(s)])
+            rewards += reward
 
+            if done.all(): break
+
+        # Get averages and standard deviations of the rewards for tests
+        avg_rwd = np.average(rewards)
+        std_rwd = np.std(rewards)
+
+        return avg_rwd, std_rwd
+
+    # Initialize a batched NumPy environment and a stack of Q-tables with shape
+    #   (runs, *discrete_os_size, action_n), viewed flat as Qf with shape
+    #   (runs, n_states, action_n), so that every run is trained together by
+    #   lrn_batch and tested by test_batch
+    def init_batch(self, resolution, runs):
+
+        # Create rolling window of the episode rewards of each run
+        self.window = RewardWindow(resolution, runs)
+        self.resolution = resolution
+
+        # Initialize one environment lane per run, each lane resetting on its
+        #   own on the step after max steps as the episodes of lrn end
+        self.runs = runs
+        self.lanes = np.arange(runs)
+        env_seed, rng_seed, self.test_seed = self.seed_seq.spawn(3)
+        self.env = self.get_env(env_seed, runs, self.maxSteps + 1)
+        self.env.reset()
+
+        # Calculate the discrete observation and action spaces and create the
+        #   random streams of the runs
+        self.init_spaces()
+        self.rng = KewRng(rng_seed, self.action_n)
+        if not self.cont_os or self.cont_as:
+            raise ValueError('Batched training needs a continuous observation'
+                    ' space and a discrete action space')
+        if self.polN:
+            raise ValueError('Batched training is not available with n-step'
+                    ' policies')
+
+        # Initialise the stack of q-tables with supplied type
+        self.Q = self.init_table([runs] + self.discrete_os_size +
+                self.discrete_as_size, self.Q)
+        self.Qf = self.Q.reshape(runs, self.n_states, -1)
+
+        # Create counter array for calculating decayed gamma values
+        if self.gDecayFlag:
+            if self.N is None or self.N.shape != self.Qf.shape:
+                self.N = np.empty(self.Qf.shape)
+            self.N.fill(1)
+
+        return
+
+    # Get the discrete states of every lane as clipped flat state indices
+    def get_discrete_states(self, states):
+        
+        return self.disc.index(states)
+
+    # Index of the q-table rows for the given lanes and their discrete states
+    def rows(self, lanes, d_s):
+        return (lanes, d_s[lanes])
+
+    # e-Greedy action selection for the given lanes from their own q-tables
+    def e_greedy_batch(self, epsilon, lanes, d_s):
+
+        d_a = np.argmax(self.Qf[self.rows(lanes, d_s)], axis=1)
+        explore = self.rng.uniforms(len(lanes)) <= epsilon
+        d_a[explore] = self.rng.actions(np.count_nonzero(explore))
+
+        return d_a
+
+    # Train every run for the given number of episodes at once, following the
+    #   same updates and terminal handling as lrn for each lane. Lanes of the
+    #   environment reset on their own when they complete the task or are cut
+    #   off after max steps, so each lane counts its own episodes and takes the
+    #   epsilon, alpha and gamma of its episode from the lists of the schedule
+    #   while the batch stays full until lanes run out of episodes. Returns the
+    #   average, minimum, maximum, upper and lower quartile learning curves of
+    #   every lane, recorded as each lane reaches a resolution step
+    def lrn_batch(self, episodes, epsilons, alphas, gammas, penalty, exponent,
+            length):
+
+        # Create array of the learning curves of every lane
+        curve = np.zeros((5, self.runs, -(-episodes // self.resolution)))
+        if episodes == 0: return curve
+
+        # Episode, steps and total reward of the current episode of each lane,
+        #   lanes are live until they complete their episodes
+        episode = np.zeros(self.runs, dtype=np.int64)
+        steps = np.zeros(self.runs, dtype=np.int64)
+        total_reward = np.zeros(self.runs)
+        live = np.ones(self.runs, dtype=bool)
+        slowest = 0
+
+        # Schedule of the current episode of each lane
+        epsilons = np.asarray(epsilons, dtype=float)
+        alphas = np.asarray(alphas, dtype=float)
+        gammas = np.asarray(gammas, dtype=float)
+        epsilon = epsilons[episode]
+        alpha = alphas[episode]
+        g = gammas[episode]
+
+        # Reset environment and get initial discretized states
+        d_s = self.get_discrete_states(self.env.reset())
+        d_a = np.zeros(self.runs, dtype=np.int64)
+        d_a_ = np.zeros(self.runs, dtype=np.int64)
+        if self.logFlag: self.trail.clear(length, self.runs)
+
+        # Get initial actions using e-Greedy method for SARSA policy
+        if self.polS: d_a = self.e_greedy_batch(epsilon, self.lanes, d_s)
+
+        # Loop until every lane has completed its episodes
+        while live.any():
+            idx = np.flatnonzero(live)
+            steps[idx] += 1
+
+            # Get actions using e-Greedy method for Q-Lrn policy
+            if self.polQ: d_a[idx] = self.e_greedy_batch(epsilon[idx], idx,
+                    d_s)
+
+            # Get next states from the chosen actions and record rewards, the
+            #   next states of lanes ending an episode are the initial states
+            #   of their next
+            s_, reward, ended, info = self.env.step(d_a)
+            total_reward[idx] += reward[idx]
+            d_s_ = self.get_discrete_states(s_)
+
+            # If gamma decay flag, calculate gamma values and iterate counters
+            if self.gDecayFlag:
+                sa = self.rows(idx, d_s) + (d_a[idx], )
+                g[idx] = 1 - np.exp(exponent * self.N[sa])
+                self.N[sa] += 1
+
+            # Split the live lanes into those continuing and those ending the
+            #   episode, of which those completing the task before the step
+            #   after max steps are updated with the penalty as in lrn
+            fin = idx[ended[idx]]
+            cont = idx[~ended[idx]]
+            end = fin[steps[fin] <= self.maxSteps]
+
+            # Select maximum action of next state for QL (off-policy), or the
+            #   expected value under the e-greedy policy for Expected SARSA
+            if self.polQ:
+                rows = self.Qf[self.rows(cont, d_s_)]
+                future = np.max(rows, axis=1)
+                if self.polE: future = epsilon[cont] / self.action_n *\
+                        rows.sum(axis=1) + (1 - epsilon[cont]) * future
+
+            # Select next action based on next state using e-Greedy method
+            #   for SARSA (on-policy)
+            if self.polS:
+                d_a_[cont] = self.e_greedy_batch(epsilon[cont], cont, d_s_)
+                future = self.Qf[self.rows(cont, d_s_) + (d_a_[cont], )]
+
+            # Update Q-values with Bellman Equation for the selected actions,
+            #   using the penalty as next SA value for completed tasks
+            upd = np.concatenate((cont, end))
+            value = np.concatenate((future, np.full(len(end), penalty)))
+            sa = self.rows(upd, d_s) + (d_a[upd], )
+            self.Qf[sa] = self.Qf[sa] + alpha[upd] * (reward[upd] + g[upd] *\
+                    value - self.Qf[sa])
+
+            # Apply exponential penalties to the steps leading up to the
+            #   completion of the ending lanes, then record the state-action
+            #   pairs of the continuing lanes, if the log flag is set
+            if self.logFlag:
+                if len(end): self.penalise_batch(end, penalty, exponent)
+                self.trail.record(d_s[cont] * self.action_n + d_a[cont],
+                        lanes=cont)
+
+            # Record the total rewards of the ending lanes in the rolling
+            #   window and their learning curves at each resolution step, then
+            #   start their next episodes
+            if len(fin):
+                self.window.record(total_reward[fin], fin)
+                rec = fin[episode[fin] % self.resolution == 0]
+                curve[:, rec, episode[rec] // self.resolution] =\
+                        self.window.stats(rec)
+
+                episode[fin] += 1
+                steps[fin] = 0
+                total_reward[fin] = 0
+                live[fin] = episode[fin] < episodes
+                if self.logFlag: self.trail.restart(fin)
+
+                # Get the schedule of the next episodes and their initial
+                #   actions for SARSA
+                new = fin[live[fin]]
+                epsilon[new] = epsilons[episode[new]]
+                alpha[new] = alphas[episode[new]]
+                g[new] = gammas[episode[new]]
+                if self.polS:
+                    d_a_[new] = self.e_greedy_batch(epsilon[new], new, d_s_)
+
+                # Report the episode and epsilon of the slowest lane, and
+                #   the results of every lane, as it reaches each resolution
+                #   step if verbose flag is set
+                if self.verboseFlag and episode.min() > slowest:
+                    slowest = episode.min()
+                    if slowest % self.resolution == 0 and slowest < episodes:
+                        avg, mins, maxs = self.window.stats()[:3]
+                        print(slowest, epsilons[slowest])
+                        print(np.average(avg), np.min(mins), np.max(maxs))
+
+            # Set next states (and actions for SARSA) to current
+            d_s = d_s_
+            if self.polS: d_a, d_a_ = d_a_, d_a
+
+        return curve
+
+    # Add the exponentially decayed penalty to the q-values of the steps before
+    #   the completion of the task by the given lanes in one scatter-add
+    def penalise_batch(self, lanes, penalty, exponent):
+        index, flag, w = self.trail.recent(penalty, exponent, lanes)
+        np.add.at(self.Qf.reshape(self.runs, -1), (lanes[:, None], index), w)
+
+    # Test the q-table of every run by playing all of the tests of every run
+    #   at once, with one lane per test in a batched NumPy environment and the
+    #   greedy policy of each run calculated once. Returns the average and
+    #   standard deviation of the test rewards for each run
+    def test_batch(self):
+
+        # Create array to store total rewards for each run and test
+        rewards = np.zeros(self.runs * self.nTests)
+
+        # Get the greedy policy of each run and the run of each test lane
+        policy = np.argmax(self.Qf, axis=2)
+        run = np.repeat(self.lanes, self.nTests)
+        env = self.get_env(self.test_seed, self.runs * self.nTests)
+        s = env.reset()
+
+        # Loop until every test is done or max steps are reached
+        for steps in range(self.maxSteps):
+            s, reward, done, info = env.step(policy[run,
+                self.get_discrete_states(s)])
+            rewards += reward
+
+            if done.all(): break
+
+        # Get averages and standard deviations of the rewards for each run
+        rewards = rewards.reshape(self.runs, self.nTests)
+        avg_rwd = np.average(rewards, axis=1)
+        std_rwd = np.std(rewards, axis=1)
+
+        return avg_rwd, std_rwd
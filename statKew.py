@@ -0,0 +1,76 @@
+import numpy as np
+
+# Rolling window of the total rewards of the last <resolution> episodes, for a
+#   single run or batched with one window per run. Rewards are written into a
+#   ring buffer and the statistics of the learning curves are calculated from
+#   the episodes recorded so far in one sort of the window. Batched windows
+#   count the episodes of each run on its own, so runs may record at different
+#   times
+class RewardWindow:
+    def __init__(self, resolution, runs=None):
+        self.resolution = resolution
+
+        # Window of rewards with one row per run if batched, with the position
+        #   of the next reward and number of rewards recorded of each run
+        if runs is None:
+            self.rewards = np.zeros(resolution)
+            self.i = 0
+            self.n = 0
+        else:
+            self.rewards = np.zeros((runs, resolution))
+            self.i = np.zeros(runs, dtype=np.int64)
+            self.n = np.zeros(runs, dtype=np.int64)
+
+    # Record the total reward of an episode, or of each of the given runs
+    #   (every run by default) if batched
+    def record(self, total_reward, runs=None):
+        if np.ndim(self.n):
+            if runs is None: runs = np.arange(len(self.n))
+            self.rewards[runs, self.i[runs]] = total_reward
+            self.i[runs] = (self.i[runs] + 1) % self.resolution
+            self.n[runs] = np.minimum(self.n[runs] + 1, self.resolution)
+            return
+
+        self.rewards[self.i] = total_reward
+
+        self.i += 1
+        if self.i == self.resolution: self.i = 0
+        if self.n < self.resolution: self.n += 1
+
+    # Average, minimum, maximum, upper and lower quartile of the window in the
+    #   order of the arguments of plotKew.plot, as an array of shape (5, ) or
+    #   (5, runs) for the given runs (every run by default) if batched.
+    #   Quartiles are linearly interpolated as with the default method of
+    #   np.percentile
+    def stats(self, runs=None):
+        if not np.ndim(self.n):
+            return self.summary(np.sort(self.rewards[:self.n]), self.n)
+
+        # Calculate the statistics of the runs with equal numbers of rewards
+        #   together
+        if runs is None: runs = np.arange(len(self.n))
+        out = np.zeros((5, len(runs)))
+        n = self.n[runs]
+        for k in np.unique(n[n > 0]).tolist():
+            sel = n == k
+            s = np.sort(self.rewards[runs[sel], :k], axis=-1)
+            out[:, sel] = self.summary(s, k)
+
+        return out
+
+    # Statistics of n sorted rewards along the last axis
+    def summary(self, s, n):
+        return np.stack([np.mean(s, axis=-1), s[..., 0], s[..., -1],
+            self.quantile(s, n, 0.75), self.quantile(s, n, 0.25)])
+
+    # Linearly interpolated quantile q of n sorted rewards
+    def quantile(self, s, n, q):
+        pos = (n - 1) * q
+        lo = int(pos)
+        hi = min(lo + 1, n - 1)
+        t = pos - lo
+
+        a = s[..., lo]
+        diff = s[..., hi] - a
+        if t >= 0.5: return s[..., hi] - diff * (1 - t)
+        return a + diff * t
@@ -0,0 +1,314 @@
+import os
+import sys
+import json
+import math
+import itertools
+import numpy as np
+import multiprocessing as mp
+from timeit import default_timer as timer
+
+# Import control scripts and the pool executor for parallel execution
+import do
+import doBin
+import doVec
+import poolKew
+import cacheKew
+from colKew import ColumnStore
+# Import single and double Q-Learning classes
+from sinKew import SinKew
+from dblKew import DblKew
+from lamKew import LamKew
+from dynaKew import DynaKew
+
+# Default hyper-parameters of every experiment, as set in the experiment
+#   templates. A sweep spec overrides these with its fixed values and the
+#   values of each cell of its grid
+defaults = {
+    'initialisation': 'uniform',    # uniform, ones, zeros
+    'policy': 'q_lrn',              # q_lrn, sarsa, expected_sarsa, nstep_...
+    'nStep': 4,                     # steps of the returns of nstep policies
+    'doubleFlag': False,
+    'lam': 0,                       # trace decay of LamKew, 0 for one-step
+    'planning': 0,                  # planning updates per step of DynaKew
+    'logFlag': False,
+    'eDecayFlag': True,
+    'eDecayExp': False,
+    'aDecayFlag': False,
+    'gDecayFlag': False,
+    'gDecayEncounter': False,
+    'profileFlag': False,
+    'verboseFlag': False,
+    'renderTest': False,
+    'renderTrain': False,
+    'environment': 'CartPole-v1',   # CartPole-v1, MountainCar-v0
+    'npEnv': False,
+    'batchFlag': False,
+    'contOS': True,
+    'contAS': False,
+    'discretisation': 6,
+    'resolution': 5,
+    'maxSteps': 500,
+    'nTests': 100,
+    'penalty': 0,
+    'exponent': -0.75,
+    'length': 5,
+    'episodes': 1000,
+    'runs': 100,
+    'bins': 10,                     # 0 or None for a single Q-table per run
+    'gamma': 0.995,
+    'alpha': 0.5,
+    'epsilon': 0.1,
+    'decay': 1.5,
+    'epsilonDecay': 0.25,
+    }
+
+# Load a sweep spec from a JSON or TOML file. A spec is a dictionary with
+#   the optional keys:
+#   fixed   - hyper-parameters shared by every experiment
+#   grid    - lists of values of hyper-parameters, every combination of which
+#               is an experiment
+#   cases   - list of dictionaries of hyper-parameters varied together, each
+#               combined with every combination of the grid
+#   plots   - plots to show of the test rewards, any of 'box' and 'hist'
+#   figures - directory to save the plots to in place of showing them, along
+#               with the learning curves of every experiment, drawn in
+#               parallel by the workers
+#   formats - file formats of the saved plots, by default ['png']
+#   workers - number of worker processes, None uses every core
+#   chunk   - number of runs per task, by default split evenly over workers
+#   seed    - seed of the sweep
+#   cache   - directory of the result cache, used only for seeded sweeps
+#   checkpoint - directory to save completed chunks of runs to, resuming the
+#               sweep from them if it is restarted
+#   tables  - also checkpoint the Q-tables and generator state of each chunk
+#   output  - directory of a ColumnStore to write the results of every run to
+#               as they complete, with the hyper-parameters of each experiment
+def load(path):
+    if path.endswith('.toml'):
+        # TOML is only in the standard library from Python 3.11, before which
+        #   the toml package is needed. It is not in the Pipfile, so JSON
+        #   specs need nothing extra
+        try: import tomllib
+        except ImportError: tomllib = None
+        if tomllib is None:
+            try: import toml
+            except ImportError:
+                raise ImportError('TOML specs need Python 3.11 or the toml'
+                        ' package (pip install toml), or use a JSON spec')\
+                        from None
+            return toml.load(path)
+        with open(path, 'rb') as f: return tomllib.load(f)
+
+    with open(path) as f: return json.load(f)
+
+# Expand a spec into the list of hyper-parameters of each experiment and the
+#   labels of the values which vary between experiments
+def expand(spec):
+    base = dict(defaults)
+    base.update(spec.get('fixed', {}))
+
+    grid = spec.get('grid', {})
+    cases = spec.get('cases', [{}])
+
+    cells = []
+    for case in cases:
+        for values in itertools.product(*grid.values()):
+            cell = dict(base)
+            cell.update(case)
+            cell.update(zip(grid.keys(), values))
+            cells.append(cell)
+
+    # Reject unknown names rather than silently ignoring a misspelt value, and
+    #   combinations of values that no learner trains
+    for cell in cells:
+        unknown = set(cell) - set(defaults)
+        if unknown: raise ValueError(f'Unknown hyper-parameters: {unknown}')
+        check(cell)
+
+    # Every experiment shares one result store so must agree on its shape
+    for k in ('runs', 'episodes', 'resolution'):
+        if len(set(cell[k] for cell in cells)) > 1:
+            raise ValueError(f'{k} must be the same in every experiment')
+
+    varied = [k for k in defaults if len(set(repr(cell[k]) for cell in
+        cells)) > 1]
+    labels = [' '.join(f'{k}={cell[k]}' for k in varied) for cell in cells]
+
+    return cells, labels
+
+# Reject an experiment asking for options its learner does not have, rather
+#   than silently running a different learner
+def check(c):
+    nstep = c['policy'].startswith('nstep_') or c['nStep'] != defaults['nStep']
+
+    if c['lam']:
+        if c['batchFlag'] or c['doubleFlag'] or c['logFlag'] or nstep:
+            raise ValueError('lam is not available with batchFlag, doubleFlag,'
+                    ' logFlag, nStep or nstep policies')
+
+    if c['doubleFlag'] and c['policy'].startswith('nstep_'):
+        raise ValueError('nstep policies are not available with doubleFlag')
+
+    if c['batchFlag'] and nstep:
+        raise ValueError('nStep and nstep policies are not available with'
+                ' batchFlag')
+
+    if c['planning']:
+        if c['lam'] or c['batchFlag'] or c['doubleFlag'] or c['logFlag'] or\
+                nstep:
+            raise ValueError('planning is not available with lam, batchFlag,'
+                    ' doubleFlag, logFlag, nStep or nstep policies')
+        if c['gDecayEncounter']:
+            raise ValueError('planning is not available with gDecayEncounter')
+
+# Create the learner, control function and control arguments of an experiment
+def job(c):
+    check(c)
+
+    # Calculate the decay period and rate
+    eDecayStart = 1
+    eDecayEnd = c['episodes'] // c['decay']
+    eDecayRate = c['epsilonDecay'] / eDecayEnd
+
+    # Create number of individual data points for run length
+    dataPoints = c['episodes'] / c['resolution']
+
+    # Initialise the eligibility trace class if lambda is set, the planning
+    #   class if planning is set, otherwise the double or single QL class with
+    #   the doubleFlag value provided
+    learner = (c['initialisation'], c['policy'], c['environment'], c['contOS'],
+            c['contAS'], c['discretisation'], c['maxSteps'], c['nTests'],
+            c['gDecayEncounter'], c['verboseFlag'], c['renderTest'],
+            c['renderTrain'], c['npEnv'])
+    if c['lam']: q = LamKew(*learner, lam=c['lam'])
+    elif c['planning']: q = DynaKew(*learner, planning=c['planning'])
+    elif c['doubleFlag']: q = DblKew(*learner, log=c['logFlag'])
+    else: q = SinKew(*learner, log=c['logFlag'], nStep=c['nStep'])
+
+    # Select the control function, binned or not and batched or not
+    if not c['bins']:
+        ctrl = doVec.do if c['batchFlag'] else do.do
+        bins = ()
+    else:
+        ctrl = doVec.doBin if c['batchFlag'] else doBin.do
+        bins = (c['bins'], )
+
+    args = (c['episodes'], ) + bins + (c['resolution'], dataPoints,
+            c['profileFlag'], c['eDecayFlag'], c['gamma'], c['alpha'],
+            c['epsilon'], c['decay'], c['epsilonDecay'], eDecayStart,
+            eDecayEnd, eDecayRate, c['eDecayExp'], c['aDecayFlag'],
+            c['gDecayFlag'], c['penalty'], c['exponent'], c['length'],
+            c['renderTest'])
+
+    return q, ctrl, args
+
+# Run every experiment of a spec across a pool of workers, returning the
+#   hyper-parameters, labels and aggregate arrays of each experiment. Each
+#   experiment is seeded from the sweep seed and a hash of its own
+#   hyper-parameters, so its results do not depend on the other experiments of
+#   the sweep and seeded results are loaded from the cache when present
+def run(spec):
+    cells, labels = expand(spec)
+
+    # Start experiment timer
+    start = timer()
+
+    runs = cells[0]['runs']
+    dataPoints = cells[0]['episodes'] / cells[0]['resolution']
+
+    # Split the runs of every experiment into a chunk per worker, independent
+    #   of the number of experiments so that adding one keeps the random
+    #   streams and cached results of the others
+    workers = spec.get('workers')
+    if workers is None: workers = mp.cpu_count()
+    chunk = spec.get('chunk')
+    if chunk is None: chunk = max(1, math.ceil(runs / workers))
+    chunk = min(chunk, runs)
+
+    # Seed each experiment from the sweep seed and its hyper-parameters
+    seed = spec.get('seed')
+    if seed is None: seeds = [None] * len(cells)
+    else: seeds = [np.random.SeedSequence([seed, int(cacheKew.key(cell), 16)])
+            for cell in cells]
+
+    # Load the results of experiments already in the cache, keyed by their
+    #   hyper-parameters, seed and chunks which determine their random streams
+    #   and the version of the learners which produced them
+    results = [None] * len(cells)
+    cache = spec.get('cache')
+    if cache is not None and seed is not None:
+        cache = cacheKew.ResultCache(cache)
+        keys = [cacheKew.key({'cell': cell, 'seed': seed, 'chunk': chunk,
+                'version': cacheKew.version}) for cell in cells]
+        results = [cache.get(k) for k in keys]
+    else: cache = None
+
+    # Write cached experiments to the output store, the rest are written by
+    #   the workers as they run
+    store = spec.get('output')
+    if store is not None:
+        store = ColumnStore(store, len(cells), runs, dataPoints, cells)
+        for e, result in enumerate(results):
+            if result is not None: store.write(e, 0, result)
+
+    # Execute the remaining experiments and add them to the cache
+    todo = [e for e in range(len(cells)) if results[e] is None]
+    print('Cached:', len(cells) - len(todo), 'of', len(cells))
+    if todo:
+        # Checkpoint in a directory of its own for these experiments, so
+        #   chunks are only resumed by a sweep of the same experiments
+        checkpoint = spec.get('checkpoint')
+        if checkpoint is not None:
+            checkpoint = os.path.join(checkpoint, cacheKew.key({'cells':
+                [cells[e] for e in todo], 'seed': seed, 'chunk': chunk}))
+
+        fresh = poolKew.sweep([job(cells[e]) for e in todo], runs, dataPoints,
+                workers, chunk, [seeds[e] for e in todo], checkpoint=checkpoint,
+                tables=spec.get('tables', False), store=store, index=todo)
+        for e, result in zip(todo, fresh):
+            results[e] = result
+            if cache is not None: cache.put(keys[e], result)
+
+    # End timer and print time and the average test reward of each experiment
+    end = timer()
+    print('Time:', end-start)
+    for e, label in enumerate(labels):
+        print(e + 1, label, np.average(results[e][0]))
+
+    return cells, labels, results
+
+# Plot the test rewards of every experiment as set in the spec, shown or saved
+#   to files along with the learning curves of each experiment
+def plot(spec, results):
+    # Import plotting functions only when plotting
+    import plotKew as plt
+
+    rwds = [np.asarray(r[0]) for r in results]
+    avgs = [np.average(r) for r in rwds]
+    ind = list(range(1, len(results) + 1))
+
+    figures = []
+    plots = spec.get('plots', ['box'])
+    if 'box' in plots: figures.append(('boxPlot', (rwds, avgs, ind), 'box'))
+    if 'hist' in plots:
+        row = int(math.floor(math.sqrt(len(results))))
+        col = int(math.ceil(len(results) / row))
+        figures.append(('histExp', (rwds, row, col, len(results)), 'hist'))
+
+    # Show the plots of the test rewards one after another
+    if spec.get('figures') is None:
+        for f, args, name in figures: getattr(plt, f)(*args)
+        return
+
+    # Save every plot and the average learning curves of each experiment
+    for e, r in enumerate(results):
+        figures.append(('plot', [np.mean(a, axis=0) for a in r[2:]],
+            f'curves{e + 1}'))
+    plt.render(figures, spec['figures'], spec.get('formats', ['png']),
+            spec.get('workers'))
+
+# Run the sweep spec of the file given on the command line and plot it
+if __name__ == '__main__':
+    spec = load(sys.argv[1])
+    cells, labels, results = run(spec)
+    plot(spec, results)
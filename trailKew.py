@@ -0,0 +1,68 @@
+import math
+import numpy as np
+
+# Ring buffer of the flat state-action indices of the most recent steps of an
+#   episode for each of one or more lanes, used to apply an exponentially
+#   decayed penalty to the steps leading up to a failed episode. Each step is
+#   written over the oldest in place, along with a flag per step such as the
+#   table updated by double Q-learning. With several lanes each lane counts
+#   its own steps, so lanes may record and restart their episodes separately
+class PenaltyTrail:
+    def __init__(self):
+        self.length = 0
+        self.n = 0
+        self.index = np.zeros((1, 0), dtype=np.int64)
+        self.flag = np.zeros((1, 0), dtype=bool)
+
+    # Empty the trail at the start of an episode, resizing it only if the
+    #   length or number of lanes has changed. The steps are counted for each
+    #   lane if the number of lanes is given
+    def clear(self, length, lanes=None):
+        shape = (1 if lanes is None else lanes, length)
+        if self.index.shape != shape:
+            self.index = np.zeros(shape, dtype=np.int64)
+            self.flag = np.zeros(shape, dtype=bool)
+        self.length = length
+        if lanes is None: self.n = 0
+        else: self.n = np.zeros(lanes, dtype=np.int64)
+
+    # Empty the trail of the given lanes as they start a new episode
+    def restart(self, lanes):
+        self.n[lanes] = 0
+
+    # Record the flat index and flag of a step of every lane, or of the given
+    #   lanes if the steps are counted for each lane
+    def record(self, i, flag=False, lanes=None):
+        if self.length == 0: return
+
+        if lanes is not None:
+            pos = self.n[lanes] % self.length
+            self.index[lanes, pos] = i
+            self.flag[lanes, pos] = flag
+            self.n[lanes] += 1
+            return
+
+        pos = self.n % self.length
+        self.index[:, pos] = i
+        self.flag[:, pos] = flag
+        self.n += 1
+
+    # Indices and flags of the recorded steps of the given lanes, most recent
+    #   first, with the penalty * exp(exponent) ** k of the kth most recent.
+    #   If the steps are counted for each lane every lane gets length steps,
+    #   with a weight of 0 for those not recorded in its episode
+    def recent(self, penalty, exponent, lanes=0):
+        if np.ndim(self.n):
+            n = self.n[lanes][:, None]
+            k = np.arange(self.length)
+            slots = (n - 1 - k) % max(self.length, 1)
+            w = penalty * math.exp(exponent) ** k * (k < n)
+
+            return self.index[lanes[:, None], slots],\
+                    self.flag[lanes[:, None], slots], w
+
+        k = min(self.n, self.length)
+        slots = (self.n - 1 - np.arange(k)) % max(self.length, 1)
+        w = penalty * math.exp(exponent) ** np.arange(k)
+
+        return self.index[lanes][..., slots], self.flag[lanes][..., slots], w